@@ -0,0 +1,245 @@
+"""Load-test live capture against fleets of simulated devices
+
+Usage: python scripts/load_test_live_capture.py [--devices N | --sweep N,N,...]
+                                                [--rate R] [--duration S] [--csv FILE]
+                                                [--transport socket|memory]
+
+For each fleet size, a fresh SimulatedFleet is captured through
+LiveCaptureManager.start_live_capture_all with checkpoints on, saved after
+every delivered batch into a scratch store as in the CLI. With the default
+socket transport every device is served over the ZK TCP protocol by a
+SimulatedDeviceServer on its own loopback address (127.99.x.y, port 4370,
+which needs Linux), and capture goes through connect_machine, pyzk's packet
+parsing and real socket timeouts. The server shares the process, so CPU
+includes the device side of the protocol. ``--transport memory`` injects the
+simulator as connect/disconnect instead and measures only the in-process
+capture path, without sockets or pyzk.
+
+Punches are then generated at --rate punches per second per device for
+--duration seconds. Every event delivered to a listener is timed from its
+punch, which gives end-to-end latency percentiles. The run also reports delivered events/s, device polls/s, CPU (fraction of one core),
+peak RSS and peak thread count. A sweep prints one row per fleet size (the
+capacity curve) and can write them to CSV. A fleet size fails when events
+are lost or the p99 latency exceeds --slo.
+"""
+import argparse
+import contextlib
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+COLUMNS = ('devices', 'punches', 'delivered', 'lost', 'events_per_s', 'polls_per_s',
+           'p50_ms', 'p90_ms', 'p99_ms', 'max_ms', 'cpu_pct', 'rss_mb', 'threads',
+           'startup_s', 'stop_s', 'ok')
+
+def rss_mb():
+    """Current resident memory in MiB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+class Sampler(threading.Thread):
+    """Track peak RSS and thread count while a run is in progress"""
+
+    def __init__(self, interval=0.5):
+        super().__init__(name='load-sampler', daemon=True)
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.peak_rss = rss_mb()
+        self.peak_threads = threading.active_count()
+
+    def sample(self):
+        rss = rss_mb()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        self.peak_threads = max(self.peak_threads, threading.active_count())
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+        self.sample()
+
+def run_fleet(size, args):
+    """Capture one simulated fleet under load, return a result row"""
+    from zkmanager import store
+    from zkmanager.config import machines
+    from zkmanager.live import LiveCaptureManager
+    from zkmanager.simulator import SimulatedDeviceServer, SimulatedFleet
+
+    sockets = args.transport == 'socket'
+    fleet = SimulatedFleet(size, latency=args.latency, network='127.99' if sockets else '10.99')
+    machines[:] = fleet.machines
+    server = None
+    if sockets:
+        # Capture connects with connect_machine/disconnect_machine, as in the CLI
+        server = SimulatedDeviceServer(fleet.devices.values(), users=args.users)
+        server.start()
+        connect = disconnect = None
+    else:
+        connect, disconnect = fleet.connect, fleet.disconnect
+    store.STORE_DIR = tempfile.mkdtemp(prefix='zk-load-')
+    manager = LiveCaptureManager(use_checkpoints=True, connect=connect,
+                                 disconnect=disconnect, poll_interval=args.poll,
+                                 echo=args.verbose, start_delay=args.start_delay)
+
+    latencies = []
+    last_delivery = [None]
+
+    def listener(event):
+        record = fleet.devices[event['machine']].attendance[int(event['user_id']) - 1]
+        now = time.perf_counter()
+        latencies.append(now - record.punched_at)  # list.append is atomic
+        last_delivery[0] = now
+
+    manager.add_listener(listener)
+    sampler = Sampler()
+    sampler.start()
+    output = open(os.devnull, 'w') if not args.verbose else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            manager.start_live_capture_all()
+            # Punch only after every worker has positioned itself at the end of the log
+            ready_deadline = time.time() + args.drain
+            while (any(device.polls == 0 for device in fleet.devices.values())
+                   and time.time() < ready_deadline):
+                time.sleep(0.01)
+            startup = time.perf_counter() - start
+
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            polls_start = sum(device.polls for device in fleet.devices.values())
+            punches = fleet.drive(args.rate, args.duration, seed=args.seed)
+            drain_deadline = time.perf_counter() + args.drain
+            while len(latencies) < punches and time.perf_counter() < drain_deadline:
+                time.sleep(0.05)
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            polls = sum(device.polls for device in fleet.devices.values()) - polls_start
+
+            stop_start = time.perf_counter()
+            manager.stop_live_capture(timeout=max(10, args.poll * 2))
+            stop = time.perf_counter() - stop_start
+    finally:
+        sampler.stop()
+        if output is not sys.stdout:
+            output.close()
+        if server is not None:
+            server.stop()
+        shutil.rmtree(store.STORE_DIR, ignore_errors=True)
+
+    ordered = sorted(latencies)
+    delivered = len(ordered)
+    active = (last_delivery[0] - wall_start) if last_delivery[0] else wall
+    row = {
+        'devices': size,
+        'punches': punches,
+        'delivered': delivered,
+        'lost': punches - delivered,
+        'events_per_s': round(delivered / active, 1) if active > 0 else 0,
+        'polls_per_s': round(polls / wall, 1),
+        'cpu_pct': round(cpu / wall * 100, 1),
+        'rss_mb': round(sampler.peak_rss, 1) if sampler.peak_rss is not None else None,
+        'threads': sampler.peak_threads,
+        'startup_s': round(startup, 2),
+        'stop_s': round(stop, 2),
+    }
+    for name, fraction in (('p50_ms', 0.5), ('p90_ms', 0.9), ('p99_ms', 0.99), ('max_ms', 1.0)):
+        value = percentile(ordered, fraction)
+        row[name] = round(value * 1000, 1) if value is not None else None
+    row['ok'] = row['lost'] == 0 and row['p99_ms'] is not None and row['p99_ms'] <= args.slo * 1000
+    return row
+
+def print_rows(rows):
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in COLUMNS}
+    print("  ".join(column.rjust(widths[column]) for column in COLUMNS))
+    for row in rows:
+        print("  ".join(str(row[column]).rjust(widths[column]) for column in COLUMNS))
+
+def main():
+    parser = argparse.ArgumentParser(description='Live capture load test with simulated fleets')
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--devices', type=int, default=100, help='Fleet size (default: 100)')
+    size.add_argument('--sweep', help='Comma-separated fleet sizes, e.g. 100,250,500,1000')
+    parser.add_argument('--rate', type=float, default=0.2,
+                        help='Punches per second per device (default: 0.2)')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of punching per fleet')
+    parser.add_argument('--poll', type=float, default=2, help='Capture poll interval (default: 2)')
+    parser.add_argument('--transport', choices=('socket', 'memory'), default='socket',
+                        help='socket: pyzk over TCP to loopback devices (default); '
+                             'memory: in-process connections only')
+    parser.add_argument('--users', type=int, default=10,
+                        help='Users per device, read with every poll over sockets (default: 10)')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Simulated log transfer time per poll in seconds (default: 0.05)')
+    parser.add_argument('--start-delay', type=float, default=0.01,
+                        help='Pause between machine starts (the CLI uses 0.1)')
+    parser.add_argument('--drain', type=float, default=15,
+                        help='Seconds to wait for the first polls and for outstanding events')
+    parser.add_argument('--slo', type=float, default=5,
+                        help='p99 latency in seconds a fleet size must stay within (default: 5)')
+    parser.add_argument('--seed', type=int, default=1, help='Punch generator seed')
+    parser.add_argument('--csv', help='Write the result rows to this CSV file')
+    parser.add_argument('--verbose', action='store_true', help='Keep capture output and live events')
+    args = parser.parse_args()
+    if args.poll <= 0:
+        parser.error('--poll must be positive (workers would busy-loop)')
+
+    if args.transport == 'socket':
+        from zkmanager import device
+        device.PING_FIRST = False
+
+    sizes = [int(value) for value in args.sweep.split(',')] if args.sweep else [args.devices]
+    rows = []
+    for fleet_size in sizes:
+        print(f"Running {fleet_size} devices ({args.transport}) at {args.rate:g} punches/s each "
+              f"for {args.duration:g}s...", flush=True)
+        try:
+            rows.append(run_fleet(fleet_size, args))
+        except OSError as e:
+            if args.transport != 'socket':
+                raise
+            print(f"Cannot serve devices on 127.99.x.y:4370 ({e}). The socket transport needs "
+                  f"every 127.0.0.0/8 address on loopback (Linux); use --transport memory")
+            return 2
+        print_rows(rows[-1:])
+
+    print()
+    print_rows(rows)
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Results written to {args.csv}")
+    passing = [row['devices'] for row in rows if row['ok']]
+    print(f"Largest fleet within the p99 SLO of {args.slo:g}s without lost events: "
+          f"{max(passing) if passing else 'none'}")
+    return 0 if all(row['ok'] for row in rows) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Measure CLI startup time and fail when it exceeds the budget
+
+Usage: python scripts/startup_budget.py [--runs N]
+
+Each scenario is run in a fresh interpreter and the median wall time is
+compared with its budget. Command modules that cannot be imported because an
+optional dependency (e.g. pyzk) is missing are reported as skipped.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Budgets in seconds, including interpreter start-up
+HELP_BUDGET = 0.25
+COMMAND_IMPORT_BUDGET = 0.6
+
+def measure(command, runs):
+    """Return (median seconds, error output) for a command"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1:]
+    return statistics.median(timings), None
+
+def main():
+    parser = argparse.ArgumentParser(description='CLI startup time budget')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    from zkmanager.cli import COMMANDS
+
+    scenarios = [
+        ('main.py --help', [sys.executable, 'main.py', '--help'], HELP_BUDGET),
+        ('main.py check --help', [sys.executable, 'main.py', 'check', '--help'], HELP_BUDGET),
+    ]
+    for name, spec in COMMANDS.items():
+        code = f"import importlib; importlib.import_module({spec['module']!r})"
+        scenarios.append((f"import {name} command", [sys.executable, '-c', code],
+                          COMMAND_IMPORT_BUDGET))
+
+    failures = 0
+    print(f"{'Scenario':<32} {'Median':>9} {'Budget':>9}  Result")
+    for label, command, budget in scenarios:
+        elapsed, error = measure(command, args.runs)
+        if elapsed is None:
+            print(f"{label:<32} {'-':>9} {budget:>8.3f}s  SKIPPED ({' '.join(error)})")
+            continue
+        ok = elapsed <= budget
+        failures += not ok
+        print(f"{label:<32} {elapsed:>8.3f}s {budget:>8.3f}s  {'OK' if ok else 'OVER BUDGET'}")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Stress the live capture manager with many simulated devices
+
+Usage: python scripts/stress_live_capture.py [--devices N] [--punches N] [--smoke]
+
+Punches are generated on every simulated device while reader threads keep
+draining (clear_live_data) and snapshotting the captured events. At the end
+every device's drained events and listener deliveries must be exactly its
+punches, in order: no event lost or duplicated. Workers must have exited
+after stop. Exits non-zero on any violation.
+
+``--smoke`` runs a small fleet for a few seconds. It is cheap enough to run
+before every commit that touches live.py.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def main():
+    parser = argparse.ArgumentParser(description='Live capture stress test')
+    parser.add_argument('--devices', type=int, default=200)
+    parser.add_argument('--punches', type=int, default=50, help='Punches per device')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--poll', type=float, default=0.01, help='Poll interval in seconds')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--smoke', action='store_true',
+                        help='Quick check: 20 devices, 10 punches each, 2 readers, 20s timeout')
+    args = parser.parse_args()
+    if args.smoke:
+        args.devices, args.punches, args.readers, args.timeout = 20, 10, 2, 20
+    if args.poll <= 0:
+        parser.error('--poll must be positive (workers would busy-loop)')
+
+    from zkmanager.live import LiveCaptureManager
+    from zkmanager.simulator import SimulatedFleet
+
+    fleet = SimulatedFleet(args.devices)
+    manager = LiveCaptureManager(use_checkpoints=False, connect=fleet.connect,
+                                 disconnect=fleet.disconnect, poll_interval=args.poll, echo=False)
+
+    delivered = defaultdict(list)
+    delivered_lock = threading.Lock()
+
+    def listener(event):
+        with delivered_lock:
+            delivered[event['machine']].append(event['user_id'])
+
+    manager.add_listener(listener)
+    for machine in fleet.machines:
+        manager.start_live_capture_single(machine)
+
+    # Punch only after every worker has positioned itself at the end of the log
+    ready_deadline = time.time() + args.timeout
+    while (any(device.polls == 0 for device in fleet.devices.values())
+           and time.time() < ready_deadline):
+        time.sleep(0.01)
+
+    drained = defaultdict(list)
+    drained_lock = threading.Lock()
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            batch = manager.clear_data()
+            manager.snapshot()
+            with drained_lock:
+                for machine, events in batch.items():
+                    drained[machine].extend(event['user_id'] for event in events)
+            time.sleep(random.random() * 0.005)
+
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in readers:
+        thread.start()
+
+    start = time.perf_counter()
+    devices = list(fleet.devices.values())
+    for _ in range(args.punches):
+        random.shuffle(devices)
+        for device in devices:
+            device.punch()
+        time.sleep(0.001)
+
+    expected = args.devices * args.punches
+    deadline = time.time() + args.timeout
+    while time.time() < deadline:
+        with delivered_lock:
+            if sum(len(events) for events in delivered.values()) >= expected:
+                break
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+
+    manager.stop_live_capture()
+    done.set()
+    for thread in readers:
+        thread.join()
+    for machine, events in manager.clear_data().items():
+        drained[machine].extend(event['user_id'] for event in events)
+
+    failures = []
+    sequence = [str(i) for i in range(1, args.punches + 1)]
+    for machine in fleet.machines:
+        if drained[machine] != sequence:
+            failures.append(f"{machine}: drained {len(drained[machine])} events, "
+                            f"{len(set(drained[machine]))} unique")
+        if delivered[machine] != sequence:
+            failures.append(f"{machine}: listener got {len(delivered[machine])} events, "
+                            f"{len(set(delivered[machine]))} unique")
+    alive = [thread.name for thread in threading.enumerate() if thread.name.startswith('live-')]
+    if alive:
+        failures.append(f"{len(alive)} capture thread(s) still alive after stop")
+
+    total = sum(len(events) for events in drained.values())
+    print(f"Devices: {args.devices}  Punches: {expected}  Captured: {total}  "
+          f"in {elapsed:.2f}s ({total / elapsed:.0f} events/s)")
+    for failure in failures[:20]:
+        print(f"FAIL {failure}")
+    print("OK: no lost or duplicated events" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
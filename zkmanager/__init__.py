@@ -0,0 +1,6 @@
+"""ZK Attendance Machine Manager
+
+Modules are imported on demand by the command registry in ``zkmanager.cli``
+so that ``--help`` and one-shot commands never pay for pyzk or live capture
+set-up they do not use.
+"""
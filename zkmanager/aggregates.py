@@ -0,0 +1,203 @@
+"""Incrementally maintained per-user, per-day attendance aggregates
+
+For every user and day the store keeps the first punch, the last punch, the
+punch count and the set of machines punched on, one JSON file per month::
+
+    <store>/aggregates/2024-06.json       {user_id: {day: {first_in, last_out, punches, devices}}}
+    <store>/aggregates/keys/2024-06.json  {machine: {day: [time|user_id|punch folded]}}
+
+Events from sync or live capture are queued by ``add_events`` and folded by
+``flush``. Every folded punch is remembered by machine, day and key. Any
+source can therefore feed any punch in any order: a punch already folded by
+live capture is not counted again by a later sync, while the earlier punches
+that sync brings in are still folded. ``flush`` holds an inter-process lock
+on the aggregates directory and re-reads the month files it changes, so
+concurrent syncs, sharded workers and live capture do not overwrite each
+other. Daily and monthly reports read one month file instead of rescanning
+raw logs. ``rebuild`` regenerates everything from the raw attendance in the
+store.
+"""
+import glob
+import os
+import shutil
+import threading
+import time
+
+from . import store
+
+AGGREGATES_DIR = 'aggregates'
+KEYS_DIR = 'keys'
+LOCK_FILE = '.lock'
+
+def aggregates_dir(store_dir=None, create=False):
+    """Return the directory holding the aggregate files"""
+    path = os.path.join(store.store_root(store_dir), AGGREGATES_DIR)
+    if create:
+        os.makedirs(os.path.join(path, KEYS_DIR), exist_ok=True)
+    return path
+
+def _event_key(user_id, clock, punch):
+    return f"{clock}|{user_id}|{punch}"
+
+class DailyAggregates:
+    """Month files loaded on demand; queued events are folded and flushed atomically"""
+
+    def __init__(self, store_dir=None):
+        self.store_dir = store_dir
+        self.lock = threading.Lock()
+        self.months = {}
+        self.pending = []
+
+    def _path(self, month, keys=False):
+        directory = aggregates_dir(self.store_dir)
+        return os.path.join(directory, KEYS_DIR, f"{month}.json") if keys else \
+            os.path.join(directory, f"{month}.json")
+
+    def month(self, month):
+        """Return {user_id: {day: entry}} of a month ('YYYY-MM') as last flushed"""
+        if month not in self.months:
+            self.months[month] = store.read_json(self._path(month), {})
+        return self.months[month]
+
+    def add_events(self, machine, events):
+        """Queue events of a machine for the next flush, return the number queued
+
+        Events are live capture event dicts, store attendance dicts or pyzk
+        Attendance records.
+        """
+        queued = []
+        for event in events:
+            data = event if isinstance(event, dict) else store.attendance_to_dict(event)
+            timestamp = data['timestamp']
+            if not isinstance(timestamp, str):
+                timestamp = timestamp.isoformat()
+            queued.append((machine, store.normalize_user_id(data['user_id']), timestamp,
+                           data['punch']))
+        with self.lock:
+            self.pending.extend(queued)
+        return len(queued)
+
+    def _fold(self, pending, months, keys, changed):
+        """Fold events not folded before into the loaded months, return the number folded"""
+        folded = 0
+        for machine, user_id, timestamp, punch in pending:
+            day, clock = timestamp[:10], timestamp[11:19]
+            month = day[:7]
+            if month not in months:
+                months[month] = store.read_json(self._path(month), {})
+                keys[month] = {machine_name: {day_name: set(day_keys)
+                                              for day_name, day_keys in days.items()}
+                               for machine_name, days in
+                               store.read_json(self._path(month, keys=True), {}).items()}
+            seen = keys[month].setdefault(machine, {}).setdefault(day, set())
+            key = _event_key(user_id, clock, punch)
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = months[month].setdefault(user_id, {}).get(day)
+            if entry is None:
+                months[month][user_id][day] = {'first_in': clock, 'last_out': clock,
+                                               'punches': 1, 'devices': [machine]}
+            else:
+                entry['first_in'] = min(entry['first_in'], clock)
+                entry['last_out'] = max(entry['last_out'], clock)
+                entry['punches'] += 1
+                if machine not in entry['devices']:
+                    entry['devices'].append(machine)
+            changed.add(month)
+            folded += 1
+        return folded
+
+    def _write(self, months, keys, changed):
+        for month in sorted(changed):
+            store.write_json_atomic(self._path(month), months[month])
+            store.write_json_atomic(self._path(month, keys=True), {
+                machine: {day: sorted(day_keys) for day, day_keys in days.items()}
+                for machine, days in keys[month].items()})
+            self.months[month] = months[month]
+
+    def flush(self):
+        """Fold the queued events that were not folded before, return the number folded"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+            if not pending:
+                return 0
+            directory = aggregates_dir(self.store_dir, create=True)
+            with store.file_lock(os.path.join(directory, LOCK_FILE)):
+                months, keys, changed = {}, {}, set()
+                folded = self._fold(pending, months, keys, changed)
+                self._write(months, keys, changed)
+            return folded
+
+    def rebuild(self, machines=None):
+        """Regenerate all aggregates from the raw attendance in the store"""
+        machines = machines if machines is not None else store.stored_machines(self.store_dir)
+        with self.lock:
+            self.pending = []
+            directory = aggregates_dir(self.store_dir, create=True)
+            with store.file_lock(os.path.join(directory, LOCK_FILE)):
+                for path in glob.glob(os.path.join(directory, '*.json')):
+                    os.remove(path)
+                shutil.rmtree(os.path.join(directory, KEYS_DIR), ignore_errors=True)
+                os.makedirs(os.path.join(directory, KEYS_DIR), exist_ok=True)
+                self.months = {}
+                months, keys, changed, total = {}, {}, set(), 0
+                for machine in machines:
+                    pending = [(machine, store.normalize_user_id(data['user_id']),
+                                data['timestamp'].isoformat(), data['punch'])
+                               for data in store.load_attendance(machine, self.store_dir)]
+                    self._fold(pending, months, keys, changed)
+                    total += len(pending)
+                self._write(months, keys, changed)
+        return total
+
+class AggregateListener:
+    """Live capture listener folding events into aggregates, flushing periodically"""
+
+    def __init__(self, aggregates, flush_interval=5):
+        self.aggregates = aggregates
+        self.flush_interval = flush_interval
+        self.last_flush = time.time()
+
+    def __call__(self, event_data):
+        self.aggregates.add_events(event_data['machine'], [event_data])
+        if time.time() - self.last_flush >= self.flush_interval:
+            self.last_flush = time.time()
+            self.aggregates.flush()
+
+    def close(self):
+        self.aggregates.flush()
+
+# ==================== REPORTS ====================
+
+def _seconds(clock):
+    hours, minutes, seconds = (int(part) for part in clock.split(':'))
+    return hours * 3600 + minutes * 60 + seconds
+
+def _clock(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def day_report(aggregates, day):
+    """Rows (user_id, first_in, last_out, punches, devices) for one day ('YYYY-MM-DD')"""
+    rows = []
+    for user_id, days in aggregates.month(day[:7]).items():
+        entry = days.get(day)
+        if entry:
+            rows.append((user_id, entry['first_in'], entry['last_out'], entry['punches'],
+                         ';'.join(sorted(entry['devices']))))
+    rows.sort(key=lambda row: (row[1], row[0]))
+    return rows
+
+def month_report(aggregates, month):
+    """Rows (user_id, days, punches, avg first_in, avg last_out, devices) for 'YYYY-MM'"""
+    rows = []
+    for user_id, days in aggregates.month(month).items():
+        entries = list(days.values())
+        devices = sorted({device for entry in entries for device in entry['devices']})
+        rows.append((user_id, len(entries), sum(entry['punches'] for entry in entries),
+                     _clock(sum(_seconds(entry['first_in']) for entry in entries) / len(entries)),
+                     _clock(sum(_seconds(entry['last_out']) for entry in entries) / len(entries)),
+                     ';'.join(devices)))
+    rows.sort(key=lambda row: row[0].zfill(12))
+    return rows
@@ -0,0 +1,149 @@
+"""Streaming attendance retrieval with since/until/user filters
+
+``conn.get_attendance()`` downloads the whole ATTLOG buffer, decodes every
+record into an ``Attendance`` and only then lets callers filter.
+``iter_attendance`` reads the buffer chunk by chunk with pyzk's buffered
+read commands, decodes records as their bytes arrive and yields only the
+matching ones. Memory stays flat however large the log is, and callers can
+stop iterating at any time. The device buffer is freed either way.
+
+The whole log is always scanned: records are not guaranteed to be in time
+order (device clock changes), so a range cannot be located by seeking.
+
+The chunked reads use pyzk private methods (``ZK.__send_command``,
+``ZK.__read_chunk``). When those are not available the buffer is read in one
+go with ``read_with_buffer`` and decoded incrementally. Connections without
+either (other pyzk versions, simulators) fall back to ``get_attendance()``.
+"""
+from datetime import datetime
+from struct import pack, unpack
+
+from zk import const
+from zk.attendance import Attendance
+
+from .store import normalize_user_id
+
+_CMD_PREPARE_BUFFER = 1503
+_HEADER_SIZE = 4
+
+def decode_time(raw):
+    """Decode a 4-byte device timestamp (zkemsdk DecodeTime)"""
+    t = unpack('<I', raw)[0]
+    second, t = t % 60, t // 60
+    minute, t = t % 60, t // 60
+    hour, t = t % 24, t // 24
+    day, t = t % 31 + 1, t // 31
+    month, t = t % 12 + 1, t // 12
+    return datetime(t + 2000, month, day, hour, minute, second)
+
+class _RecordDecoder:
+    """Decode one record of the 8, 16 or 40 byte ATTLOG formats"""
+
+    def __init__(self, record_size, users):
+        self.record_size = record_size
+        # Older formats carry only the internal uid or a numeric user ID
+        self.user_id_by_uid = {user.uid: user.user_id for user in users}
+        self.uid_by_user_id = {user.user_id: user.uid for user in users}
+
+    def decode(self, data, offset=0):
+        if self.record_size == 8:
+            uid, status, timestamp, punch = unpack('<HB4sB', data[offset:offset + 8])
+            user_id = self.user_id_by_uid.get(uid, str(uid))
+        elif self.record_size == 16:
+            number, timestamp, status, punch, _, _ = unpack('<I4sBB2sI', data[offset:offset + 16])
+            # The record's user ID is kept, the user table only supplies the uid
+            user_id = str(number)
+            uid = self.uid_by_user_id.get(user_id, number)
+        else:
+            uid, user_id, status, timestamp, punch, _ = unpack('<H24sB4sB8s', data[offset:offset + 40])
+            user_id = user_id.split(b'\x00')[0].decode(errors='ignore')
+        return Attendance(user_id, decode_time(timestamp), status, punch, uid)
+
+def _decode_buffer(data, records, users):
+    """Yield the records of a complete ATTLOG buffer (header included)"""
+    decoder = _RecordDecoder(_record_size(unpack('I', data[:4])[0], records), users)
+    for offset in range(_HEADER_SIZE, len(data) - decoder.record_size + 1, decoder.record_size):
+        yield decoder.decode(data, offset)
+
+def _record_size(total_size, records):
+    size = total_size / records
+    return int(size) if size in (8, 16) else 40
+
+def _has_chunked_reads(conn):
+    return hasattr(conn, '_ZK__send_command') and hasattr(conn, '_ZK__read_chunk')
+
+def _prepare_buffer(conn):
+    """Have the device prepare the ATTLOG buffer, return (inline data or None, size)"""
+    command_string = pack('<bhii', 1, const.CMD_ATTLOG_RRQ, 0, 0)
+    response = conn._ZK__send_command(_CMD_PREPARE_BUFFER, command_string, 1024)
+    if not response.get('status'):
+        raise RuntimeError("Buffered read not supported")
+    data = conn._ZK__data
+    if response['code'] == const.CMD_DATA:
+        # Small logs come back in the reply itself
+        if conn.tcp and len(data) < conn._ZK__tcp_length - 8:
+            data = b''.join([data, conn._ZK__recieve_raw_data(conn._ZK__tcp_length - 8 - len(data))])
+        return data, len(data)
+    return None, unpack('I', data[1:5])[0]
+
+def _read_chunks(conn, start, size):
+    """Yield the prepared buffer from ``start`` in chunks"""
+    max_chunk = 0xFFc0 if conn.tcp else 16 * 1024
+    while start < size:
+        length = min(max_chunk, size - start)
+        yield conn._ZK__read_chunk(start, length)
+        start += length
+
+def _iter_records(conn, users=None):
+    """Yield every record of the device log"""
+    conn.read_sizes()
+    records = conn.records
+    if not records:
+        return
+    # Must be read before the ATTLOG buffer is prepared, it uses the same buffer
+    if users is None:
+        users = conn.get_users()
+
+    if not _has_chunked_reads(conn):
+        data, size = conn.read_with_buffer(const.CMD_ATTLOG_RRQ)
+        if size >= _HEADER_SIZE:
+            yield from _decode_buffer(data, records, users)
+        return
+
+    data, size = _prepare_buffer(conn)
+    if data is not None:
+        yield from _decode_buffer(data, records, users)
+        return
+    try:
+        header = conn._ZK__read_chunk(0, _HEADER_SIZE)
+        decoder = _RecordDecoder(_record_size(unpack('I', header[:4])[0], records), users)
+        buffer = bytearray()
+        for chunk in _read_chunks(conn, _HEADER_SIZE, size):
+            buffer += chunk
+            usable = len(buffer) - len(buffer) % decoder.record_size
+            for offset in range(0, usable, decoder.record_size):
+                yield decoder.decode(buffer, offset)
+            del buffer[:usable]
+    finally:
+        conn.free_data()
+
+def iter_attendance(conn, since=None, until=None, user_id=None, users=None):
+    """Yield attendance records with since <= timestamp <= until for one user or all
+
+    ``users`` is the device's user list if the caller already downloaded it;
+    otherwise it is read from the device to decode the older record formats.
+    """
+    wanted = normalize_user_id(user_id) if user_id is not None else None
+    if _has_chunked_reads(conn) or hasattr(conn, 'read_with_buffer'):
+        source = _iter_records(conn, users)
+    else:
+        source = iter(conn.get_attendance())
+
+    for record in source:
+        if until is not None and record.timestamp > until:
+            continue
+        if since is not None and record.timestamp < since:
+            continue
+        if wanted is not None and normalize_user_id(record.user_id) != wanted:
+            continue
+        yield record
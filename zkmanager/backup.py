@@ -0,0 +1,399 @@
+"""Full-device backup to compressed, checksummed archives and restore
+
+Each backup is one ``.tar.gz`` per device under ``<backup dir>/<machine>/``::
+
+    device.json       serial, name, firmware, platform, clock, capacities
+    users.jsonl       user table, including PINs needed for a faithful restore
+                      (unlike the store, so archives are created with mode 0600)
+    templates.jsonl   fingerprint templates (hex encoded)
+    attendance.jsonl  attendance records
+    manifest.json     sha256, record count and size of every member
+
+plus a ``.sha256`` sidecar of the whole archive. Members are streamed
+through spooled temporary files while hashing, so memory stays bounded.
+
+Incremental backups (the default once a previous archive exists) store only
+attendance not in the previous backup, and users/templates only when their
+content hash changed; the manifest names the previous archive as its
+``base``. The manifest also lists the punches at its ``attendance_until``
+second, so a punch made later in that same second is still picked up.
+Restore walks that chain. Attendance cannot be written back to a device over
+the ZK protocol, so restore pushes users and templates only, each batch of
+users with their templates in one buffered upload.
+"""
+import hashlib
+import json
+import os
+import tarfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from struct import pack
+
+BACKUP_DIR = os.environ.get('ZK_BACKUP_DIR', 'zk_backups')
+MANIFEST_VERSION = 1
+SPOOL_SIZE = 8 * 1024 * 1024
+# Stores the users and templates of a prepared data buffer (CMD_SAVE_USERTEMPS)
+_CMD_SAVE_USERTEMPS = 110
+
+# ==================== ARCHIVE HELPERS ====================
+
+def machine_backup_dir(machine, backup_dir=None):
+    """Directory holding the archives of a machine"""
+    return os.path.join(backup_dir or BACKUP_DIR, machine.replace(':', '_'))
+
+def list_archives(machine, backup_dir=None):
+    """Archives of a machine, oldest first"""
+    directory = machine_backup_dir(machine, backup_dir)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith('.tar.gz'))
+
+def file_sha256(path):
+    """sha256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _add_jsonl_member(archive, name, rows):
+    """Stream rows as JSON lines into an archive member, return its manifest entry"""
+    digest = hashlib.sha256()
+    count = 0
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+        for row in rows:
+            line = (json.dumps(row, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+            digest.update(line)
+            spool.write(line)
+            count += 1
+        size = spool.tell()
+        spool.seek(0)
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(datetime.now().timestamp())
+        archive.addfile(info, spool)
+    return {'sha256': digest.hexdigest(), 'records': count, 'bytes': size}
+
+def _add_json_member(archive, name, data):
+    payload = json.dumps(data, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+        spool.write(payload)
+        spool.seek(0)
+        info = tarfile.TarInfo(name)
+        info.size = len(payload)
+        info.mtime = int(datetime.now().timestamp())
+        archive.addfile(info, spool)
+    return {'sha256': hashlib.sha256(payload).hexdigest(), 'bytes': len(payload)}
+
+def read_manifest(path):
+    """Read the manifest of an archive"""
+    with tarfile.open(path, 'r:gz') as archive:
+        return json.load(archive.extractfile('manifest.json'))
+
+def read_member(path, name):
+    """Yield the JSON rows of an archive member"""
+    with tarfile.open(path, 'r:gz') as archive:
+        for line in archive.extractfile(name):
+            if line.strip():
+                yield json.loads(line)
+
+def verify_archive(path):
+    """Check the archive sidecar and every member checksum, return list of problems"""
+    problems = []
+    sidecar = f"{path}.sha256"
+    if os.path.exists(sidecar):
+        with open(sidecar, encoding='utf-8') as f:
+            expected = f.read().split()[0]
+        if file_sha256(path) != expected:
+            problems.append("archive checksum mismatch")
+    else:
+        problems.append("missing .sha256 sidecar")
+
+    manifest = read_manifest(path)
+    with tarfile.open(path, 'r:gz') as archive:
+        for name, entry in manifest['members'].items():
+            digest = hashlib.sha256()
+            member = archive.extractfile(name)
+            for chunk in iter(lambda: member.read(1024 * 1024), b''):
+                digest.update(chunk)
+            if digest.hexdigest() != entry['sha256']:
+                problems.append(f"{name} checksum mismatch")
+    return problems
+
+# ==================== BACKUP ====================
+
+def _user_row(user):
+    return {'uid': user.uid, 'user_id': user.user_id, 'name': user.name,
+            'privilege': user.privilege, 'password': user.password,
+            'group_id': user.group_id, 'card': user.card}
+
+def _template_row(template):
+    return {'uid': template.uid, 'fid': template.fid, 'valid': template.valid,
+            'template': template.template.hex()}
+
+def _record_key(record):
+    """Identity of a punch as stored in the manifest's attendance_until_keys"""
+    return (str(record.user_id), record.timestamp.isoformat(), record.punch, record.status)
+
+def _content_hash(rows):
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(json.dumps(row, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+def _device_info(conn):
+    info = {}
+    for key, getter in (('serial', 'get_serialnumber'), ('name', 'get_device_name'),
+                        ('firmware', 'get_firmware_version'), ('platform', 'get_platform'),
+                        ('time', 'get_time')):
+        try:
+            info[key] = getattr(conn, getter)()
+        except Exception:
+            info[key] = None
+    try:
+        conn.read_sizes()
+        for key in ('users', 'fingers', 'records', 'users_cap', 'fingers_cap', 'rec_cap'):
+            info[key] = getattr(conn, key, None)
+    except Exception:
+        pass
+    return info
+
+def backup_machine(machine, backup_dir=None, full=False):
+    """Back up one machine, return the archive path or None"""
+    from .device import connect_machine, disconnect_machine
+
+    previous = list_archives(machine, backup_dir)
+    base = None
+    if previous and not full:
+        try:
+            base = (previous[-1], read_manifest(previous[-1]))
+        except Exception as e:
+            print(f"  ⚠️ {machine}: previous archive unreadable ({e}), taking a full backup")
+
+    conn = connect_machine(machine)
+    if not conn:
+        return None
+    try:
+        info = _device_info(conn)
+        users = [_user_row(user) for user in conn.get_users()]
+        templates = [_template_row(template) for template in conn.get_templates()]
+        attendance = conn.get_attendance()
+    except Exception as e:
+        print(f"  ❌ {machine}: backup download failed: {e}")
+        return None
+    finally:
+        disconnect_machine(conn)
+
+    since = base[1].get('attendance_until') if base else None
+    # Punches of the cut-off second may still be new: skip only those the base holds
+    seen = {tuple(key) for key in base[1].get('attendance_until_keys', [])} if base else set()
+    new_attendance = ({'uid': record.uid, 'user_id': record.user_id,
+                       'timestamp': record.timestamp.isoformat(),
+                       'status': record.status, 'punch': record.punch}
+                      for record in attendance
+                      if since is None or record.timestamp.isoformat() > since
+                      or (record.timestamp.isoformat() == since and _record_key(record) not in seen))
+
+    hashes = {'users.jsonl': _content_hash(users), 'templates.jsonl': _content_hash(templates)}
+    created_at = datetime.now()
+    directory = machine_backup_dir(machine, backup_dir)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    stem = os.path.join(directory, f"{info.get('serial') or 'unknown'}_{created_at:%Y%m%d_%H%M%S}")
+    path = f"{stem}.tar.gz"
+    suffix = 1
+    while os.path.exists(path):
+        path = f"{stem}_{suffix}.tar.gz"
+        suffix += 1
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'machine': machine,
+        'serial': info.get('serial'),
+        'created_at': created_at.isoformat(),
+        'kind': 'incremental' if base else 'full',
+        'base': os.path.basename(base[0]) if base else None,
+        'content_hashes': hashes,
+        'members': {},
+        'unchanged': [],
+    }
+    tmp_path = f"{path}.partial"
+    # The archive holds user PINs: readable by the owner only
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f, tarfile.open(fileobj=f, mode='w:gz') as archive:
+        manifest['members']['device.json'] = _add_json_member(archive, 'device.json', info)
+        for name, rows in (('users.jsonl', users), ('templates.jsonl', templates)):
+            if base and base[1].get('content_hashes', {}).get(name) == hashes[name]:
+                manifest['unchanged'].append(name)
+            else:
+                manifest['members'][name] = _add_jsonl_member(archive, name, rows)
+        manifest['members']['attendance.jsonl'] = _add_jsonl_member(
+            archive, 'attendance.jsonl', new_attendance)
+        until = max((record.timestamp.isoformat() for record in attendance), default=since)
+        boundary = {_record_key(record) for record in attendance
+                    if record.timestamp.isoformat() == until}
+        if until == since:
+            boundary |= seen
+        manifest['attendance_since'] = since
+        manifest['attendance_until'] = until
+        manifest['attendance_until_keys'] = sorted(boundary)
+        _add_json_member(archive, 'manifest.json', manifest)
+    os.replace(tmp_path, path)
+    with open(f"{path}.sha256", 'w', encoding='utf-8') as f:
+        f.write(f"{file_sha256(path)}  {os.path.basename(path)}\n")
+
+    members = manifest['members']
+    print(f"  ✅ {machine}: {manifest['kind']} backup -> {path}\n"
+          f"     users: {members.get('users.jsonl', {}).get('records', 'unchanged')}, "
+          f"templates: {members.get('templates.jsonl', {}).get('records', 'unchanged')}, "
+          f"new attendance: {members['attendance.jsonl']['records']}")
+    return path
+
+def backup_all(machines, backup_dir=None, full=False, workers=8):
+    """Back up all machines concurrently, return {machine: archive path or None}"""
+    print(f"💾 Backing up {len(machines)} machine(s) into {backup_dir or BACKUP_DIR}...")
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(machines)))) as pool:
+        futures = {machine: pool.submit(backup_machine, machine, backup_dir, full)
+                   for machine in machines}
+    results = {}
+    for machine, future in futures.items():
+        try:
+            results[machine] = future.result()
+        except Exception as e:
+            print(f"  ❌ {machine}: backup failed: {e}")
+            results[machine] = None
+    done = sum(1 for path in results.values() if path)
+    print(f"\n📋 BACKUP SUMMARY: {done}/{len(machines)} machine(s) backed up")
+    return results
+
+# ==================== RESTORE ====================
+
+def archive_chain(path):
+    """The archive followed by its base archives, newest first"""
+    chain = []
+    while path and path not in chain:
+        chain.append(path)
+        base = read_manifest(path).get('base')
+        if not base:
+            break
+        path = os.path.join(os.path.dirname(path), base)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Base archive {base} is missing")
+    return chain
+
+def resolve_member(path, name):
+    """Find the archive in the base chain that holds a member's current content"""
+    for archive_path in archive_chain(path):
+        if name in read_manifest(archive_path)['members']:
+            return archive_path
+    return None
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _save_user_templates(conn, user_templates):
+    """Write a batch of (user, fingers) pairs in one buffered upload
+
+    This is pyzk's ``HR_save_usertemplates``, built from ``_send_with_buffer``
+    on pyzk versions that do not have it. Users without fingers are written
+    too. Connections without buffered uploads (simulators, other libraries)
+    fall back to one set_user/save_user_template call per user.
+    """
+    if hasattr(conn, 'HR_save_usertemplates'):
+        conn.HR_save_usertemplates(user_templates)
+        return
+    if not (hasattr(conn, '_send_with_buffer') and hasattr(conn, '_ZK__send_command')):
+        for user, fingers in user_templates:
+            if fingers:
+                conn.save_user_template(user, fingers)
+            else:
+                conn.set_user(uid=user.uid, name=user.name, privilege=user.privilege,
+                              password=user.password, group_id=user.group_id,
+                              user_id=user.user_id, card=user.card)
+        return
+    users, table, templates = [], [], []
+    offset = 0
+    for user, fingers in user_templates:
+        users.append(user.repack29() if conn.user_packet_size == 28 else user.repack73())
+        for finger in fingers:
+            template = finger.repack_only()
+            table.append(pack('<bHbI', 2, user.uid, 0x10 + finger.fid, offset))
+            templates.append(template)
+            offset += len(template)
+    users, table, templates = b''.join(users), b''.join(table), b''.join(templates)
+    conn._send_with_buffer(pack('III', len(users), len(table), len(templates)) + users + table + templates)
+    response = conn._ZK__send_command(_CMD_SAVE_USERTEMPS, pack('<IHH', 12, 0, 8))
+    if not response.get('status'):
+        raise RuntimeError("Device rejected the user and template upload")
+
+def restore_machine(machine, archive_path, batch_size=100, dry_run=False):
+    """Push users and templates from an archive (and its base chain) to a machine"""
+    from zk.finger import Finger
+    from zk.user import User
+    from .device import connect_machine, disconnect_machine
+
+    # Users and templates may come from any base archive, so verify the whole chain
+    try:
+        chain = archive_chain(archive_path)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return False
+    for path in chain:
+        problems = verify_archive(path)
+        if problems:
+            print(f"❌ Archive {os.path.basename(path)} failed verification: {', '.join(problems)}")
+            return False
+
+    users_path = resolve_member(archive_path, 'users.jsonl')
+    templates_path = resolve_member(archive_path, 'templates.jsonl')
+    if users_path is None:
+        print("❌ No user table found in the archive chain")
+        return False
+    users = [User(row['uid'], row['name'], row['privilege'], row['password'] or '',
+                  row['group_id'], row['user_id'], row['card'])
+             for row in read_member(users_path, 'users.jsonl')]
+    fingers = {}
+    if templates_path:
+        for row in read_member(templates_path, 'templates.jsonl'):
+            fingers.setdefault(row['uid'], []).append(
+                Finger(row['uid'], row['fid'], row['valid'], bytes.fromhex(row['template'])))
+
+    print(f"♻️ Restoring {len(users)} users and "
+          f"{sum(len(f) for f in fingers.values())} templates to {machine}")
+    if dry_run:
+        print("🧪 Dry run: nothing written")
+        return True
+
+    conn = connect_machine(machine)
+    if not conn:
+        return False
+    try:
+        conn.disable_device()
+        # Reading the user table sets the device's user record size for the upload
+        conn.get_users()
+        done = 0
+        for batch in _batches(users, batch_size):
+            _save_user_templates(conn, [(user, fingers.get(user.uid, [])) for user in batch])
+            done += len(batch)
+            print(f"  👥 Users and templates {done}/{len(users)}")
+
+        conn.refresh_data()
+        print(f"✅ Restore to {machine} complete (attendance is not restorable over the ZK protocol)")
+        return True
+    except Exception as e:
+        print(f"❌ Restore to {machine} failed: {e}")
+        return False
+    finally:
+        try:
+            conn.enable_device()
+        except Exception:
+            pass
+        disconnect_machine(conn)
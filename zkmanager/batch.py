@@ -0,0 +1,230 @@
+"""Batch scripts: a list of operations run over one session per device
+
+A script file has one operation per line with optional ``key=value``
+arguments, ``#`` starts a comment::
+
+    # nightly.zk
+    get_time
+    sync_time max_drift=30
+    count_users
+    pull_logs
+    refresh_data
+
+Every target machine is connected once and the operations run in order on
+that session; machines run concurrently. Each operation's result (or error)
+is collected into a report that can be written as JSON. Operations that
+change the device are marked as writes and only reported in dry-run mode.
+"""
+import inspect
+import json
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from . import store
+from .device import connect_machine, disconnect_machine
+from .profiling import machine_of
+
+OPERATIONS = {}
+
+def operation(name, writes=False, uses_store=False):
+    """Register ``func(conn, **args)`` as a batch operation"""
+    def register(func):
+        OPERATIONS[name] = {'func': func, 'writes': writes, 'uses_store': uses_store,
+                            'help': func.__doc__}
+        return func
+    return register
+
+# ==================== OPERATIONS ====================
+
+@operation('device_info')
+def op_device_info(conn):
+    """Serial number, device name, firmware and platform"""
+    return {
+        'serial': conn.get_serialnumber(),
+        'device_name': conn.get_device_name(),
+        'firmware': conn.get_firmware_version(),
+        'platform': conn.get_platform(),
+    }
+
+@operation('get_time')
+def op_get_time(conn):
+    """Device time and its drift from this host in seconds"""
+    device_time = conn.get_time()
+    return {'device_time': device_time.isoformat(),
+            'drift_seconds': round((device_time - datetime.now()).total_seconds(), 1)}
+
+@operation('count_users')
+def op_count_users(conn):
+    """User, fingerprint and attendance record counts with capacities"""
+    conn.read_sizes()
+    return {'users': conn.users, 'users_cap': getattr(conn, 'users_cap', None),
+            'fingers': conn.fingers, 'fingers_cap': getattr(conn, 'fingers_cap', None),
+            'records': conn.records, 'rec_cap': getattr(conn, 'rec_cap', None)}
+
+@operation('pull_logs', uses_store=True)
+def op_pull_logs(conn, store_dir=None):
+    """Append new attendance records to the local store"""
+    machine = machine_of(conn)
+    return {'new_records': store.append_attendance(machine, conn.get_attendance(), store_dir)}
+
+@operation('pull_users', uses_store=True)
+def op_pull_users(conn, store_dir=None):
+    """Save the user table to the local store"""
+    users = conn.get_users()
+    store.save_users(machine_of(conn), users, store_dir)
+    return {'users': len(users)}
+
+@operation('sync_time', writes=True)
+def op_sync_time(conn, max_drift=0):
+    """Set the device clock to this host's time if it drifted more than max_drift seconds"""
+    drift = (conn.get_time() - datetime.now()).total_seconds()
+    if abs(drift) <= float(max_drift):
+        return {'drift_seconds': round(drift, 1), 'changed': False}
+    conn.set_time(datetime.now())
+    return {'drift_seconds': round(drift, 1), 'changed': True}
+
+@operation('refresh_data', writes=True)
+def op_refresh_data(conn):
+    """Refresh the device's internal data"""
+    conn.refresh_data()
+
+@operation('enable_device', writes=True)
+def op_enable_device(conn):
+    """Enable the device (unlock the keypad and sensors)"""
+    conn.enable_device()
+
+@operation('disable_device', writes=True)
+def op_disable_device(conn):
+    """Disable the device (lock the keypad and sensors)"""
+    conn.disable_device()
+
+@operation('test_voice', writes=True)
+def op_test_voice(conn, index=0):
+    """Play a voice prompt"""
+    conn.test_voice(index=int(index))
+
+@operation('delete_user', writes=True)
+def op_delete_user(conn, uid):
+    """Delete a user by internal uid"""
+    conn.delete_user(uid=int(uid))
+
+@operation('clear_attendance', writes=True)
+def op_clear_attendance(conn):
+    """Clear the attendance log (pull_logs first)"""
+    conn.clear_attendance()
+
+@operation('restart', writes=True)
+def op_restart(conn):
+    """Restart the device (ends the session, use as the last operation)"""
+    conn.restart()
+
+# ==================== SCRIPTS ====================
+
+def parse_script(lines):
+    """Parse script lines into [(name, {arg: value})], raising ValueError on errors"""
+    steps = []
+    for number, line in enumerate(lines, 1):
+        words = shlex.split(line, comments=True)
+        if not words:
+            continue
+        name, arguments = words[0], {}
+        if name not in OPERATIONS:
+            raise ValueError(f"line {number}: unknown operation '{name}'")
+        for word in words[1:]:
+            key, sep, value = word.partition('=')
+            if not sep:
+                raise ValueError(f"line {number}: expected key=value, got '{word}'")
+            arguments[key] = value
+        try:
+            inspect.signature(OPERATIONS[name]['func']).bind(None, **arguments)
+        except TypeError as e:
+            raise ValueError(f"line {number}: {name}: {e}")
+        steps.append((name, arguments))
+    return steps
+
+def load_script(path):
+    """Parse a script file"""
+    with open(path, encoding='utf-8') as f:
+        return parse_script(f)
+
+def run_on_machine(machine, steps, dry_run=False, keep_going=False, store_dir=None):
+    """Run all steps over one session, return the machine's report"""
+    start = time.perf_counter()
+    report = {'machine': machine, 'connected': False, 'steps': []}
+    conn = connect_machine(machine)
+    if not conn:
+        report['seconds'] = round(time.perf_counter() - start, 3)
+        return report
+    report['connected'] = True
+    failed = False
+    try:
+        for name, arguments in steps:
+            spec = OPERATIONS[name]
+            step = {'op': name, 'args': arguments}
+            if failed:
+                step['status'] = 'skipped'
+            elif spec['writes'] and dry_run:
+                step['status'] = 'dry_run'
+            else:
+                kwargs = dict(arguments)
+                if spec['uses_store']:
+                    kwargs.setdefault('store_dir', store_dir)
+                step_start = time.perf_counter()
+                try:
+                    step['result'] = spec['func'](conn, **kwargs)
+                    step['status'] = 'ok'
+                except Exception as e:
+                    step['status'] = 'error'
+                    step['error'] = str(e)
+                    failed = not keep_going
+                step['seconds'] = round(time.perf_counter() - step_start, 3)
+            report['steps'].append(step)
+    finally:
+        try:
+            disconnect_machine(conn)
+        except Exception as e:
+            # The steps already ran; keep their results instead of losing the report
+            report['disconnect_error'] = str(e)
+    report['seconds'] = round(time.perf_counter() - start, 3)
+    return report
+
+def run_script(steps, machines, workers=8, dry_run=False, keep_going=False, store_dir=None):
+    """Run a parsed script on all machines concurrently, return {machine: report}"""
+    mode = " (dry run: write operations skipped)" if dry_run else ""
+    print(f"📜 Running {len(steps)} operation(s) on {len(machines)} machine(s){mode}...")
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(machines)))) as pool:
+        futures = {machine: pool.submit(run_on_machine, machine, steps, dry_run, keep_going, store_dir)
+                   for machine in machines}
+    reports = {}
+    for machine, future in futures.items():
+        try:
+            reports[machine] = future.result()
+        except Exception as e:
+            reports[machine] = {'machine': machine, 'connected': False, 'error': str(e), 'steps': []}
+    return reports
+
+def print_report(reports):
+    """Print one block per machine and a summary line"""
+    for machine, report in reports.items():
+        if not report['connected']:
+            print(f"\n❌ {machine}: not connected")
+            continue
+        print(f"\n🖥️ {machine} ({report['seconds']:.1f}s)")
+        for step in report['steps']:
+            icon = {'ok': '✅', 'error': '❌', 'dry_run': '🧪', 'skipped': '⏭️'}[step['status']]
+            detail = step.get('error') or (json.dumps(step['result'], ensure_ascii=False, default=str)
+                                           if step.get('result') is not None else '')
+            print(f"  {icon} {step['op']:<16} {detail}")
+        if report.get('disconnect_error'):
+            print(f"  ⚠️ Disconnect failed: {report['disconnect_error']}")
+    ok = sum(1 for report in reports.values()
+             if report['connected'] and all(step['status'] in ('ok', 'dry_run') for step in report['steps']))
+    print(f"\n📋 BATCH SUMMARY: {ok}/{len(reports)} machine(s) completed every operation")
+
+def write_report(reports, path):
+    """Write the reports as JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'generated_at': datetime.now().isoformat(), 'machines': list(reports.values())},
+                  f, ensure_ascii=False, indent=2, default=str)
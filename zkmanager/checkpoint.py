@@ -0,0 +1,70 @@
+"""Durable per-device live capture checkpoints
+
+A checkpoint records the device serial, the log position after the last
+delivered event and that event's identity. It is written atomically after
+each delivered batch, so a restarted capture resumes right after the last
+delivered event: events are delivered at least once and history is never
+replayed in full.
+"""
+import os
+from datetime import datetime
+
+from . import store
+
+CHECKPOINT_DIR = 'checkpoints'
+
+def checkpoint_path(machine, store_dir=None):
+    """Return the checkpoint file of a machine"""
+    directory = os.path.join(store.store_root(store_dir), CHECKPOINT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{machine.replace(':', '_')}.json")
+
+def record_key(record):
+    """Identity of an attendance record within one device log"""
+    return [str(record.user_id), record.timestamp.isoformat(), record.punch, record.status]
+
+def load_checkpoint(machine, store_dir=None):
+    """Load a machine's checkpoint, or None"""
+    return store.read_json(checkpoint_path(machine, store_dir))
+
+def make_checkpoint(machine, serial, position, record):
+    """Checkpoint stating that events up to ``position`` (ending with ``record``) were delivered"""
+    return {
+        'machine': machine,
+        'serial': serial,
+        'position': position,
+        'timestamp': record.timestamp.isoformat() if record is not None else None,
+        'key': record_key(record) if record is not None else None,
+        'updated_at': datetime.now().isoformat(),
+    }
+
+def save_checkpoint(checkpoint, store_dir=None):
+    """Atomically persist a checkpoint"""
+    store.write_json_atomic(checkpoint_path(checkpoint['machine'], store_dir), checkpoint)
+
+def resume_position(checkpoint, serial, attendance):
+    """Index of the first record in ``attendance`` not yet delivered
+
+    Returns (position, reason). Without a usable checkpoint capture starts at
+    the end of the current log. If the log no longer matches the checkpoint
+    (cleared or rewritten), records after the checkpoint timestamp are
+    delivered again rather than risking a gap.
+    """
+    if not checkpoint:
+        return len(attendance), "no checkpoint, starting at end of log"
+    if checkpoint.get('serial') and serial and checkpoint['serial'] != serial:
+        return len(attendance), f"serial changed ({checkpoint['serial']} -> {serial}), starting at end of log"
+    if checkpoint.get('key') is None:
+        return min(checkpoint.get('position', 0), len(attendance)), "resumed at empty log position"
+
+    position = checkpoint['position']
+    if 0 < position <= len(attendance) and record_key(attendance[position - 1]) == checkpoint['key']:
+        return position, f"resumed at record {position}"
+
+    # The log changed under us: fall back to the checkpoint timestamp
+    last_timestamp = datetime.fromisoformat(checkpoint['timestamp'])
+    for index, record in enumerate(attendance):
+        if record.timestamp > last_timestamp or (
+                record.timestamp == last_timestamp and record_key(record) != checkpoint['key']):
+            return index, f"log changed, resumed after {checkpoint['timestamp']}"
+    return len(attendance), f"log changed, nothing after {checkpoint['timestamp']}"
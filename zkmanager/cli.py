@@ -0,0 +1,283 @@
+"""Command line entry point with a lazily loaded command registry
+
+Only argparse is imported up front. Each command lives in its own module under
+``zkmanager.commands`` and is imported when it is dispatched, so ``--help``
+and cron-driven one-shot checks do not pay for pyzk, threading or the live
+capture manager unless they use them.
+"""
+import argparse
+import importlib
+import sys
+
+# name -> {'module', 'help', 'arguments'}; modules are imported on dispatch
+COMMANDS = {}
+
+def arg(*flags, **kwargs):
+    """Describe an argparse argument without building it"""
+    return flags, kwargs
+
+def iso_moment(value):
+    """argparse type for YYYY-MM-DD[THH:MM[:SS]], normalised to ISO 8601"""
+    from datetime import datetime
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD[THH:MM]")
+
+def register_command(name, module, help, arguments=()):
+    """Register a subcommand implemented by ``module.run(args)``"""
+    COMMANDS[name] = {'module': module, 'help': help, 'arguments': list(arguments)}
+
+register_command('search', 'zkmanager.commands.search',
+                 'Search users by ID or name across all target machines', [
+    arg('query', nargs='?', help='User ID or name to search for, or comma-separated user IDs'),
+    arg('--ids-file', help='Batch search the user IDs listed in this file (one per line)'),
+    arg('--by', choices=['auto', 'user_id', 'name', 'uid', 'card', 'privilege', 'group_id'],
+        default='auto',
+        help='Search field (default: user_id for numbers, name otherwise); privilege also '
+             'accepts user/enroller/manager/admin'),
+    arg('--attendance', '-a', action='store_true',
+        help='Also show recent attendance records for the user'),
+    arg('--days', type=int, default=30,
+        help='Days of attendance to show with --attendance (default: 30)'),
+])
+register_command('check', 'zkmanager.commands.check',
+                 'Comprehensive check of all target machines', [
+    arg('--workers', '-w', type=int, default=1,
+        help='Split the machines across this many worker processes'),
+])
+register_command('live', 'zkmanager.commands.live',
+                 'Start live capture for all target machines', [
+    arg('--duration', type=int, help='Stop capturing after this many seconds'),
+    arg('--no-names', action='store_true', help='Do not resolve user names for events'),
+    arg('--aggregate', action='store_true',
+        help='Fold captured events into the daily aggregates of the local store'),
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+])
+register_command('watch', 'zkmanager.commands.watch',
+                 'Alert on live punches of the user IDs in a watchlist file', [
+    arg('watchlist', help='CSV of user_id,label,rule (reloaded when it changes)'),
+    arg('--duration', type=int, help='Stop monitoring after this many seconds'),
+    arg('--alerts-log', help='Append alerts as JSON lines to this file'),
+])
+register_command('export', 'zkmanager.commands.export',
+                 'Export a merged, deduplicated attendance timeline to CSV', [
+    arg('--output', '-o', help='Output CSV file (default: attendance_export_<timestamp>.csv)'),
+    arg('--user-id', help='Only export records for this user ID'),
+    arg('--days', type=int, help='Only export records from the last N days'),
+    arg('--from-store', action='store_true',
+        help='Export from the local store instead of downloading from the machines'),
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+])
+register_command('sync', 'zkmanager.commands.sync',
+                 'Download users and attendance from all target machines into the local store', [
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+    arg('--workers', '-w', type=int, default=1,
+        help='Split the machines across this many worker processes'),
+])
+register_command('backup', 'zkmanager.commands.backup',
+                 'Back up users, templates, attendance and metadata of all target machines', [
+    arg('--dir', help='Backup directory (default: $ZK_BACKUP_DIR or ./zk_backups)'),
+    arg('--full', action='store_true', help='Take a full backup even if a previous one exists'),
+    arg('--workers', '-w', type=int, default=8, help='Machines backed up concurrently (default: 8)'),
+])
+register_command('restore', 'zkmanager.commands.restore',
+                 'Restore users and templates from a backup archive', [
+    arg('archive', help='Backup archive (.tar.gz); incremental archives use their base chain'),
+    arg('--machine', help='Machine to restore to (default: the machine in the archive)'),
+    arg('--batch-size', type=int, default=100, help='Users (with their templates) written per upload (default: 100)'),
+    arg('--dry-run', action='store_true', help='Verify and count, but write nothing'),
+    arg('--yes', '-y', action='store_true', help='Do not ask for confirmation'),
+])
+register_command('rotate', 'zkmanager.commands.rotate',
+                 'Archive and clear attendance logs of machines near capacity', [
+    arg('--threshold', type=float, default=0.8,
+        help='Rotate when the log is this full, as a fraction of capacity (default: 0.8)'),
+    arg('--max-records', type=int, help='Also rotate when the log holds this many records'),
+    arg('--force', action='store_true', help='Rotate every machine regardless of usage'),
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+    arg('--dry-run', action='store_true', help='Only report which machines would be rotated'),
+    arg('--yes', '-y', action='store_true', help='Do not ask for confirmation'),
+    arg('--watch', action='store_true',
+        help='Keep checking every --interval seconds (requires --yes or --dry-run)'),
+    arg('--interval', type=int, default=3600, help='Seconds between checks with --watch (default: 3600)'),
+])
+register_command('batch', 'zkmanager.commands.batch',
+                 'Run a script of operations over one session per target machine', [
+    arg('script', nargs='?', help='Script file: one operation per line, optional key=value arguments'),
+    arg('--list', action='store_true', help='List the available operations'),
+    arg('--dry-run', action='store_true', help='Skip operations that change the device'),
+    arg('--keep-going', action='store_true', help='Continue after a failed operation'),
+    arg('--workers', '-w', type=int, default=8, help='Machines processed concurrently (default: 8)'),
+    arg('--report', help='Write the per-machine results to this JSON file'),
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+])
+register_command('health', 'zkmanager.commands.health',
+                 'Probe all target machines with a cheap TCP/UDP protocol ping', [
+    arg('--watch', action='store_true', help='Keep probing every --interval seconds'),
+    arg('--interval', type=int, default=30, help='Seconds between probes with --watch (default: 30)'),
+    arg('--timeout', type=float, default=1.0, help='Probe timeout per transport in seconds (default: 1)'),
+    arg('--workers', '-w', type=int, default=32, help='Machines probed concurrently (default: 32)'),
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+])
+register_command('dashboard', 'zkmanager.commands.dashboard',
+                 'Live capture with a local web dashboard streaming events to browsers (SSE)', [
+    arg('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)'),
+    arg('--port', type=int, default=8080, help='Port to listen on (default: 8080)'),
+    arg('--buffer', type=int, default=1000,
+        help='Events kept in the shared ring buffer for (re)connecting viewers (default: 1000)'),
+    arg('--duration', type=int, help='Stop after this many seconds'),
+    arg('--quiet', '-q', action='store_true', help='Do not print live events to the terminal'),
+])
+register_command('replay', 'zkmanager.commands.replay',
+                 'Replay exported or stored attendance through the live capture pipeline', [
+    arg('csv', nargs='?', help='CSV written by the export command'),
+    arg('--from-store', action='store_true',
+        help='Replay the stored attendance of the target machines instead of a CSV'),
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+    arg('--speed', type=float, default=1.0,
+        help='Speed factor over the original timing, 0 = no waiting (default: 1)'),
+    arg('--max-gap', type=float, help='Cap idle gaps between punches at this many source seconds'),
+    arg('--since', help='First moment to replay (YYYY-MM-DD[THH:MM])'),
+    arg('--until', help='Stop before this moment (YYYY-MM-DD[THH:MM])'),
+    arg('--user-id', help='Only replay these user IDs (comma-separated)'),
+    arg('--machine', help='Only replay these machines (comma-separated)'),
+    arg('--watchlist', help='Raise watchlist alerts from this CSV for the replayed events'),
+    arg('--alerts-log', help='Append watchlist alerts as JSON lines to this file'),
+    arg('--aggregate', action='store_true',
+        help='Fold replayed events into the daily aggregates of the local store'),
+    arg('--dashboard', type=int, metavar='PORT', help='Also serve the live dashboard on this port'),
+    arg('--quiet', '-q', action='store_true', help='Do not print replayed events'),
+])
+register_command('report', 'zkmanager.commands.report',
+                 'Worked hours, late arrivals and missing punches per user', [
+    arg('--csv', help='Analyse a CSV written by the export command'),
+    arg('--devices', action='store_true',
+        help='Download attendance from the target machines instead of the local store'),
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+    arg('--since', type=iso_moment, help='First day to include (YYYY-MM-DD)'),
+    arg('--until', type=iso_moment, help='Last moment to include (YYYY-MM-DD[THH:MM])'),
+    arg('--shift-start', default='08:00', help='Shift start used for late arrivals (default: 08:00)'),
+    arg('--shift-end', default='17:00', help='Shift end used for early leaves (default: 17:00)'),
+    arg('--grace', type=int, default=5, help='Minutes after shift start before a punch is late'),
+    arg('--output', '-o', help='Write the per-user, per-day report to this CSV file'),
+    arg('--quiet', '-q', action='store_true', help='Do not print the per-user table'),
+])
+register_command('aggregates', 'zkmanager.commands.aggregates',
+                 'Daily and monthly reports from the incrementally maintained aggregates', [
+    arg('action', choices=('day', 'month', 'rebuild'),
+        help='day/month report, or rebuild the aggregates from the raw logs in the store'),
+    arg('--date', help='Day (YYYY-MM-DD) or month (YYYY-MM) to report (default: today / this month)'),
+    arg('--store', help='Store directory (default: $ZK_STORE_DIR or ./zk_store)'),
+    arg('--output', '-o', help='Write the report to this CSV file'),
+])
+register_command('interactive', 'zkmanager.commands.interactive',
+                 'Start interactive menu')
+
+def build_parser():
+    """Build the argument parser from the command registry"""
+    parser = argparse.ArgumentParser(description='ZK Attendance Machine Manager')
+    parser.add_argument('--target', '-t',
+                       help='Target machine IPs (comma-separated) or single IP. Example: --target 192.168.1.100 or --target 192.168.1.100,192.168.1.101,192.168.1.102')
+
+    # Legacy one-shot flags, mapped onto the subcommands below
+    parser.add_argument('--interactive', '-i', action='store_true',
+                       help='Start interactive menu')
+    parser.add_argument('--live', '-l', action='store_true',
+                       help='Start live capture for all machines')
+    parser.add_argument('--user', '-u', type=str,
+                       help='Search for specific user ID across all machines')
+    parser.add_argument('--check', '-c', action='store_true',
+                       help='Check all machines status')
+
+    parser.add_argument('--profile', nargs='?', const='zkmanager_profile', metavar='PREFIX',
+                       help='Profile the command, writing PREFIX.pstats and a PREFIX.folded flame graph (default prefix: zkmanager_profile)')
+    parser.add_argument('--timings', action='store_true',
+                       help='Print connect/transfer/parse/render time per machine when the command ends')
+    parser.add_argument('--ignore-health', action='store_true',
+                       help='Connect even to machines the health check found down')
+
+    views = parser.add_argument_group('result views (users, attendance, templates, search hits)')
+    views.add_argument('--format', choices=['table', 'quiet', 'csv', 'jsonl'], default='table',
+                       help='table: first page (pager in the interactive menu); quiet: counts only; csv/jsonl: every row (default: table)')
+    views.add_argument('--columns', help='Comma-separated columns to show, e.g. user_id,name,card')
+    views.add_argument('--sort', help='Sort rows by this column, prefix with - for descending (e.g. --sort=-timestamp)')
+    views.add_argument('--page-size', type=int, default=10, help='Rows per page (default: 10)')
+    views.add_argument('--results', metavar='FILE',
+                       help='Write csv/jsonl rows to FILE instead of stdout, apart from progress output; {kind} in FILE gives one file per record kind (user, attendance, template)')
+
+    # Lets --target also be given after the subcommand name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--target', '-t', default=argparse.SUPPRESS,
+                        help='Target machine IPs (comma-separated)')
+
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    for name, spec in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=spec['help'],
+                                          description=spec['help'], parents=[common])
+        for flags, kwargs in spec['arguments']:
+            subparser.add_argument(*flags, **kwargs)
+    return parser
+
+def resolve_command(parser, args, argv):
+    """Map legacy flags onto a registered command name"""
+    if args.command:
+        return args.command
+
+    legacy = None
+    if args.user:
+        legacy = ['search', args.user]
+    elif args.check:
+        legacy = ['check']
+    elif args.live:
+        legacy = ['live']
+    elif args.interactive or not argv:
+        legacy = ['interactive']
+
+    if legacy is None:
+        return None
+    parser.parse_args(legacy, namespace=args)
+    return args.command
+
+def load_command(name):
+    """Import a command module and return its ``run`` function"""
+    module = importlib.import_module(COMMANDS[name]['module'])
+    return module.run
+
+def main(argv=None):
+    """Parse arguments and dispatch to the selected command"""
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    name = resolve_command(parser, args, argv)
+    if name is None:
+        print("Use --help for available options")
+        return 1
+
+    from . import views
+    views.FORMAT = args.format
+    views.COLUMNS = [column.strip() for column in args.columns.split(',')] if args.columns else None
+    views.SORT = args.sort
+    views.PAGE_SIZE = args.page_size
+    views.RESULTS_FILE = args.results
+    views.separate_rows()
+    from .config import set_target_machines
+    set_target_machines(args.target)
+    store_dir = getattr(args, 'store', None)  # Only commands that use the store have --store
+    if args.ignore_health or store_dir:
+        from . import health
+        health.SKIP_DEAD = not args.ignore_health
+        health.STORE_DIR = store_dir
+
+    command = load_command(name)
+    try:
+        if args.profile:
+            from .profiling import profile_command
+            return profile_command(command, args.profile, args) or 0
+        return command(args) or 0
+    finally:
+        if args.profile or args.timings:
+            from .profiling import phase_timer
+            phase_timer.print_summary()
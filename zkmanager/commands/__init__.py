@@ -0,0 +1 @@
+"""Subcommands dispatched by ``zkmanager.cli``; each module exposes ``run(args)``"""
@@ -0,0 +1,43 @@
+"""aggregates: daily and monthly reports from the per-user, per-day aggregates"""
+import csv
+from datetime import datetime
+
+from ..aggregates import DailyAggregates, day_report, month_report
+
+DAY_COLUMNS = ('user_id', 'first_in', 'last_out', 'punches', 'devices')
+MONTH_COLUMNS = ('user_id', 'days', 'punches', 'avg_first_in', 'avg_last_out', 'devices')
+
+def run(args):
+    aggregates = DailyAggregates(args.store)
+    if args.action == 'rebuild':
+        print("🔨 Rebuilding aggregates from the attendance in the local store...")
+        total = aggregates.rebuild()
+        print(f"✅ Folded {total} attendance records")
+        return 0
+
+    if args.action == 'day':
+        period = args.date or datetime.now().strftime('%Y-%m-%d')
+        rows, columns = day_report(aggregates, period), DAY_COLUMNS
+    else:
+        period = (args.date or datetime.now().strftime('%Y-%m'))[:7]
+        rows, columns = month_report(aggregates, period), MONTH_COLUMNS
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(rows)
+        print(f"✅ Report written to: {args.output}")
+    else:
+        print(f"\n📅 {args.action.upper()} REPORT {period}: {len(rows)} user(s)")
+        if args.action == 'day':
+            print(f"{'User ID':<12} {'First in':>9} {'Last out':>9} {'Punches':>8}  Devices")
+            print("-" * 60)
+            for user_id, first_in, last_out, punches, devices in rows:
+                print(f"{user_id:<12} {first_in:>9} {last_out:>9} {punches:>8}  {devices}")
+        else:
+            print(f"{'User ID':<12} {'Days':>5} {'Punches':>8} {'Avg in':>9} {'Avg out':>9}  Devices")
+            print("-" * 66)
+            for user_id, days, punches, first_in, last_out, devices in rows:
+                print(f"{user_id:<12} {days:>5} {punches:>8} {first_in:>9} {last_out:>9}  {devices}")
+    return 0
@@ -0,0 +1,7 @@
+"""backup: snapshot users, templates, attendance and metadata of all target machines"""
+from ..backup import backup_all
+from ..config import machines
+
+def run(args):
+    results = backup_all(machines, args.dir, args.full, args.workers)
+    return 0 if all(results.values()) else 1
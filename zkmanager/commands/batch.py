@@ -0,0 +1,25 @@
+"""batch: run a script of operations over one session per target machine"""
+from ..batch import OPERATIONS, load_script, print_report, run_script, write_report
+from ..config import machines
+
+def run(args):
+    if args.list or not args.script:
+        print("Available operations (* changes the device, skipped with --dry-run):")
+        for name, spec in OPERATIONS.items():
+            print(f"  {name:<18}{'*' if spec['writes'] else ' '} {spec['help']}")
+        return 0 if args.list else 1
+
+    try:
+        steps = load_script(args.script)
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid script {args.script}: {e}")
+        return 1
+
+    reports = run_script(steps, machines, args.workers, args.dry_run, args.keep_going, args.store)
+    print_report(reports)
+    if args.report:
+        write_report(reports, args.report)
+        print(f"✅ Report written to: {args.report}")
+    failed = [report for report in reports.values()
+              if not report['connected'] or any(step['status'] == 'error' for step in report['steps'])]
+    return 1 if failed else 0
@@ -0,0 +1,19 @@
+"""check: comprehensive check of all target machines"""
+from ..config import machines
+from ..device import comprehensive_machine_check
+
+def run(args):
+    print("🔧 Checking all target machines...")
+    if args.workers and args.workers > 1:
+        from ..shard import run_sharded
+        results = run_sharded(comprehensive_machine_check, machines, args.workers)
+    else:
+        results = {machine: comprehensive_machine_check(machine) for machine in machines}
+
+    ok = [summary for summary in results.values() if summary is not None]
+    print(f"\n📋 CHECK SUMMARY:")
+    print(f"Machines OK: {len(ok)}/{len(machines)}")
+    print(f"Users: {sum(s['users'] for s in ok)}, "
+          f"attendance records: {sum(s['attendance'] for s in ok)}, "
+          f"templates: {sum(s['templates'] for s in ok)}")
+    return 0 if len(ok) == len(machines) else 1
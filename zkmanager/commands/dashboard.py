@@ -0,0 +1,29 @@
+"""dashboard: live capture with a local web view streaming events over SSE"""
+import time
+
+from ..dashboard import EventHub, serve_dashboard, stop_dashboard
+from ..live import live_manager
+
+def run(args):
+    hub = EventHub(args.buffer)
+    try:
+        server = serve_dashboard(hub, args.host, args.port)
+    except OSError as e:
+        print(f"❌ Cannot start dashboard on {args.host}:{args.port}: {e}")
+        return 1
+    live_manager.add_listener(hub)
+    live_manager.echo = not args.quiet
+    print(f"🌐 Dashboard at http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        live_manager.start_live_capture_all(args.duration)
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        live_manager.stop_live_capture()
+        live_manager.remove_listener(hub)
+        stop_dashboard(server)
@@ -0,0 +1,77 @@
+"""export: write a merged attendance timeline from all target machines to CSV"""
+import csv
+from datetime import datetime, timedelta
+
+from ..config import machines
+from ..merge import device_stream, merge_timelines, reorder
+from ..store import normalize_user_id
+
+def _device_events(machine, user_id, cutoff_date):
+    """Stream one machine's log in time order, keeping its session open while the merge reads"""
+    from ..attlog import iter_attendance
+    from ..device import connect_machine, disconnect_machine
+
+    conn = connect_machine(machine)
+    if not conn:
+        return
+    count = 0
+    try:
+        serial = conn.get_serialnumber()
+        records = iter_attendance(conn, since=cutoff_date, user_id=user_id)
+        for event in reorder(device_stream(records, machine, serial)):
+            count += 1
+            yield event
+        print(f"  ✅ {machine}: {count} records")
+    except Exception as e:
+        print(f"  ❌ Error exporting {machine} after {count} records: {e}")
+    finally:
+        disconnect_machine(conn)
+
+def _device_streams(user_id, cutoff_date):
+    """Stream each machine's log from the device without loading it into memory"""
+    return [_device_events(machine, user_id, cutoff_date) for machine in machines]
+
+def _store_streams(user_id, cutoff_date, store_dir):
+    """Stream each machine's stored log without loading it into memory"""
+    from .. import store
+
+    streams = []
+    for machine in machines:
+        if machine not in store.stored_machines(store_dir):
+            print(f"  ⭕ {machine}: not in the local store, run sync first")
+            continue
+        serial = store.load_meta(machine, store_dir).get('serial')
+        records = (record for record in store.load_attendance(machine, store_dir)
+                   if _wanted(record['user_id'], record['timestamp'], user_id, cutoff_date))
+        streams.append(reorder(device_stream(records, machine, serial)))
+    return streams
+
+def _wanted(record_user_id, timestamp, user_id, cutoff_date):
+    if user_id and normalize_user_id(record_user_id) != normalize_user_id(user_id):
+        return False
+    return not (cutoff_date and timestamp < cutoff_date)
+
+def run(args):
+    filename = args.output
+    if not filename:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"attendance_export_{timestamp}.csv"
+    cutoff_date = datetime.now() - timedelta(days=args.days) if args.days else None
+
+    if args.from_store:
+        streams = _store_streams(args.user_id, cutoff_date, args.store)
+    else:
+        streams = _device_streams(args.user_id, cutoff_date)
+
+    stats = {}
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['machine', 'serial', 'user_id', 'timestamp', 'status', 'punch', 'uid'])
+        for event in merge_timelines(streams, stats=stats):
+            writer.writerow([event['machine'], event['serial'], event['user_id'],
+                             event['timestamp'].isoformat(), event['status'],
+                             event['punch'], event['uid']])
+
+    print(f"✅ Attendance exported to: {filename}")
+    print(f"Total records exported: {stats['merged']}")
+    print(f"Duplicates skipped: {stats['duplicates']}")
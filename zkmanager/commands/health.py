@@ -0,0 +1,15 @@
+"""health: probe reachability of all target machines and keep a status history"""
+from ..config import machines
+from ..health import monitor, probe_all
+
+def run(args):
+    kwargs = dict(store_dir=args.store, workers=args.workers, timeout=args.timeout)
+    if args.watch:
+        monitor(machines, args.interval, **kwargs)
+        return 0
+    print(f"💓 Probing {len(machines)} machine(s)...")
+    health = probe_all(machines, **kwargs)
+    health.print_map(machines)
+    up = sum(1 for machine in machines if health.machines[machine]['status'] == 'up')
+    print(f"\n📋 HEALTH SUMMARY: {up}/{len(machines)} machine(s) up")
+    return 0 if up == len(machines) else 1
@@ -0,0 +1,8 @@
+"""interactive: start the interactive menu"""
+from .. import views
+from ..menu import interactive_menu
+
+def run(args):
+    # Results are browsed page by page in the menu
+    views.PAGER = views.FORMAT == 'table'
+    interactive_menu()
@@ -0,0 +1,25 @@
+"""live: start live capture for all target machines"""
+import time
+
+from ..live import live_manager, start_live_capture, stop_live_capture
+
+def run(args):
+    listener = None
+    if args.aggregate:
+        from ..aggregates import AggregateListener, DailyAggregates
+        listener = AggregateListener(DailyAggregates(args.store))
+        live_manager.add_listener(listener)
+    print("🔴 Starting live capture for all target machines...")
+    try:
+        start_live_capture(None, args.duration, not args.no_names)
+        if args.duration:
+            time.sleep(args.duration)  # Runs unattended from scripts and cron
+        else:
+            input("Press Enter to stop live capture...")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_live_capture()
+        if listener:
+            live_manager.remove_listener(listener)
+            listener.close()
@@ -0,0 +1,77 @@
+"""replay: feed exported or stored attendance back through the live pipeline"""
+from datetime import datetime
+
+from ..config import machines
+from ..live import live_manager
+from ..replay import csv_events, filter_events, print_stats, replay, store_events
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+def run(args):
+    if bool(args.csv) == bool(args.from_store):
+        print("❌ Give either a CSV file or --from-store")
+        return 1
+    if args.speed < 0:
+        print("❌ --speed must be 0 (no waiting) or positive")
+        return 1
+    try:
+        since = datetime.fromisoformat(args.since) if args.since else None
+        until = datetime.fromisoformat(args.until) if args.until else None
+    except ValueError as e:
+        print(f"❌ Invalid date: {e}")
+        return 1
+
+    if args.from_store:
+        events = store_events(machines, args.store)
+    else:
+        try:
+            events = csv_events(args.csv)
+        except OSError as e:
+            print(f"❌ Cannot read {args.csv}: {e}")
+            return 1
+    events = filter_events(events, since, until, _split(args.user_id), _split(args.machine))
+
+    # Consumers under test join the shared pipeline like during a live capture
+    listeners, closers = [], []
+    if args.watchlist:
+        from ..watchlist import Watchlist, WatchlistAlerter
+        try:
+            alerter = WatchlistAlerter(Watchlist(args.watchlist), args.alerts_log)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot load watchlist: {e}")
+            return 1
+        listeners.append(alerter)
+        closers.append(lambda: print(f"Alerts raised: {alerter.alert_count}"))
+    if args.aggregate:
+        from ..aggregates import AggregateListener, DailyAggregates
+        aggregate_listener = AggregateListener(DailyAggregates(args.store))
+        listeners.append(aggregate_listener)
+        closers.append(aggregate_listener.close)
+    server = None
+    if args.dashboard:
+        from ..dashboard import EventHub, serve_dashboard, stop_dashboard
+        hub = EventHub()
+        server = serve_dashboard(hub, port=args.dashboard)
+        listeners.append(hub)
+        closers.append(lambda: stop_dashboard(server))
+        print(f"🌐 Dashboard at http://127.0.0.1:{args.dashboard}/")
+
+    live_manager.echo = not args.quiet
+    for listener in listeners:
+        live_manager.add_listener(listener)
+    speed = f"x{args.speed:g}" if args.speed else "as fast as possible"
+    print(f"⏪ Replaying {'the local store' if args.from_store else args.csv} ({speed})... "
+          "Press Ctrl+C to stop")
+    try:
+        stats = replay(events, live_manager, speed=args.speed, max_gap=args.max_gap)
+        print_stats(stats)
+        if server is not None:
+            input("Replay finished, press Enter to close the dashboard...")
+    except KeyboardInterrupt:
+        print("\n🛑 Replay stopped")
+    finally:
+        for listener in listeners:
+            live_manager.remove_listener(listener)
+        for close in closers:
+            close()
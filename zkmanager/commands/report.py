@@ -0,0 +1,36 @@
+"""report: worked hours, late arrivals and missing punches per user"""
+import time
+
+from .. import analytics
+from ..config import machines
+
+def run(args):
+    start = time.perf_counter()
+    if args.csv:
+        print(f"📂 Loading attendance from {args.csv}...")
+        frame = analytics.load_csv(args.csv)
+    elif args.devices:
+        print(f"📡 Downloading attendance from {len(machines)} machine(s)...")
+        frame = analytics.load_devices(machines)
+    else:
+        from .. import store
+        stored = [machine for machine in machines if machine in store.stored_machines(args.store)]
+        print(f"📂 Loading attendance for {len(stored)} machine(s) from the local store...")
+        frame = analytics.load_store(stored, args.store)
+    loaded = time.perf_counter()
+
+    daily = analytics.daily_summary(frame, args.shift_start, args.shift_end, args.grace,
+                                    since=args.since, until=args.until)
+    summary = analytics.user_summary(daily)
+    done = time.perf_counter()
+
+    if args.output:
+        analytics.write_daily_csv(daily, args.output)
+        print(f"✅ Daily report written to: {args.output}")
+    if not args.quiet:
+        analytics.print_user_summary(summary)
+
+    print(f"\n📈 REPORT SUMMARY:")
+    print(f"Punches analysed: {len(frame)}")
+    print(f"Users: {len(summary['user_id'])}, user-days: {len(daily['day'])}")
+    print(f"Load: {loaded - start:.2f}s, analysis: {done - loaded:.2f}s")
@@ -0,0 +1,20 @@
+"""restore: push users and templates from a backup archive to a machine"""
+import tarfile
+
+from ..backup import read_manifest, restore_machine
+
+def run(args):
+    try:
+        manifest = read_manifest(args.archive)
+    except (OSError, tarfile.TarError, KeyError) as e:
+        print(f"❌ Cannot read archive {args.archive}: {e}")
+        return 1
+    machine = args.machine or manifest['machine']
+    print(f"📦 Archive: {args.archive} ({manifest['kind']}, {manifest['created_at']}, "
+          f"serial {manifest['serial']})")
+    if not args.dry_run and not args.yes:
+        confirm = input(f"Overwrite users and templates on {machine}? (yes/no): ")
+        if confirm.lower() != 'yes':
+            print("❌ Restore cancelled")
+            return 1
+    return 0 if restore_machine(machine, args.archive, args.batch_size, args.dry_run) else 1
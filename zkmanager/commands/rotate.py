@@ -0,0 +1,22 @@
+"""rotate: archive and clear attendance logs of machines near capacity"""
+from ..config import machines
+from ..rotation import rotate_all, rotation_job
+
+def run(args):
+    kwargs = dict(threshold=args.threshold, max_records=args.max_records, force=args.force,
+                  dry_run=args.dry_run, store_dir=args.store)
+    if args.watch:
+        if not (args.yes or args.dry_run):
+            # Nobody is there to confirm each unattended clear
+            print("❌ --watch clears logs unattended, add --yes (or --dry-run to only report)")
+            return 1
+        rotation_job(machines, args.interval, **kwargs)
+        return 0
+    if not args.dry_run and not args.yes:
+        confirm = input("Clear attendance logs of machines over the threshold after archiving? (yes/no): ")
+        if confirm.lower() != 'yes':
+            print("❌ Rotation cancelled")
+            return 1
+    results = rotate_all(machines, **kwargs)
+    failed = ('unreachable', 'count_mismatch', 'verify_failed', 'log_changed', 'error')
+    return 1 if any(result['status'] in failed for result in results.values()) else 0
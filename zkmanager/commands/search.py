@@ -0,0 +1,40 @@
+"""search: find users by ID or name across all target machines"""
+from ..search import (find_user_in_all_machines, find_user_with_attendance,
+                      find_users_batch, parse_user_ids, read_user_ids_file)
+
+def run(args):
+    if args.ids_file or (args.query and ',' in args.query):
+        if args.ids_file:
+            try:
+                user_ids = read_user_ids_file(args.ids_file)
+            except OSError as e:
+                print(f"❌ Cannot read IDs file: {e}")
+                return 1
+        else:
+            user_ids = parse_user_ids(args.query)
+        print(f"🔍 Searching for {len(user_ids)} user IDs in all target machines...")
+        find_users_batch(user_ids, args.days if args.attendance else None)
+        return
+    if not args.query:
+        print("❌ Give a user ID or name, or --ids-file")
+        return 1
+
+    query = args.query
+    search_type = args.by
+    if search_type == 'auto':
+        try:
+            query = int(query)
+            search_type = "user_id"
+        except ValueError:
+            search_type = "name"
+    elif search_type in ("user_id", "uid"):
+        try:
+            query = int(query)
+        except ValueError:
+            pass
+
+    print(f"🔍 Searching for user {args.query} in all target machines...")
+    if args.attendance:
+        find_user_with_attendance(query, args.days)
+    else:
+        find_user_in_all_machines(query, search_type)
@@ -0,0 +1,46 @@
+"""sync: download users and attendance into the local store"""
+from .. import store
+from ..aggregates import DailyAggregates
+from ..config import machines
+from ..device import connect_machine, disconnect_machine
+from ..profiling import phase_timer
+
+def sync_machine(machine, store_dir=None):
+    """Sync one machine into the store, return number of new attendance records"""
+    conn = connect_machine(machine)
+    if not conn:
+        return None
+    try:
+        meta = store.load_meta(machine, store_dir)
+        meta['serial'] = conn.get_serialnumber()
+        store.save_meta(machine, meta, store_dir)
+
+        with phase_timer.phase(machine, 'transfer'):
+            users = conn.get_users()
+            attendance = conn.get_attendance()
+        with phase_timer.phase(machine, 'parse'):
+            store.save_users(machine, users, store_dir)
+            added = store.append_attendance(machine, attendance, store_dir)
+            aggregates = DailyAggregates(store_dir)
+            aggregates.add_events(machine, attendance)
+            aggregates.flush()
+        print(f"  ✅ {machine}: {len(users)} users, {added} new attendance records")
+        return added
+    except Exception as e:
+        print(f"  ❌ Error syncing {machine}: {e}")
+        return None
+    finally:
+        disconnect_machine(conn)
+
+def run(args):
+    print(f"🔄 Syncing {len(machines)} machine(s) into {store.store_root(args.store)}...")
+    if args.workers and args.workers > 1:
+        from ..shard import run_sharded
+        results = run_sharded(sync_machine, machines, args.workers, store_dir=args.store)
+    else:
+        results = {machine: sync_machine(machine, args.store) for machine in machines}
+    synced = [added for added in results.values() if added is not None]
+    print(f"\n📋 SYNC SUMMARY:")
+    print(f"Machines synced: {len(synced)}/{len(machines)}")
+    print(f"New attendance records: {sum(synced)}")
+    return 0 if len(synced) == len(machines) else 1
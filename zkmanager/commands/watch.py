@@ -0,0 +1,10 @@
+"""watch: alert on punches of every user ID in a watchlist file"""
+from ..watchlist import Watchlist, monitor_watchlist
+
+def run(args):
+    try:
+        watchlist = Watchlist(args.watchlist)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cannot load watchlist: {e}")
+        return 1
+    monitor_watchlist(watchlist, args.duration, args.alerts_log)
@@ -0,0 +1,22 @@
+"""Target machine configuration shared by all commands"""
+
+DEFAULT_MACHINES = ["192.168.9.x", "192.168.7.x", "192.168.10.x"]
+
+# Mutated in place so that modules holding a reference see target changes
+machines = DEFAULT_MACHINES.copy()
+
+def set_target_machines(target_string):
+    """Set target machines from command line argument"""
+    if target_string:
+        # Tách các IP bằng dấu phẩy và loại bỏ khoảng trắng
+        machines[:] = [ip.strip() for ip in target_string.split(',') if ip.strip()]
+        print(f"🎯 Target machines set to: {machines}")
+    else:
+        print(f"📡 Using default machines: {machines}")
+
+def show_current_targets():
+    """Show current target machines"""
+    print(f"\n📡 Current target machines:")
+    for i, machine in enumerate(machines, 1):
+        print(f"  {i}. {machine}")
+    print()
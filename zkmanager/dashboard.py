@@ -0,0 +1,213 @@
+"""Local web dashboard streaming live capture events over Server-Sent Events
+
+``EventHub`` is a live capture listener. Every event goes into a single ring
+buffer with a sequence number, and per-machine rate counters are updated.
+Each browser connection is served by its own HTTP thread that only keeps a
+cursor into the ring and waits on a condition, so any number of viewers
+share one buffer and one capture pipeline. Viewers add no device load and
+no per-viewer queues. Filters (``?user=1258,1301&machine=10.0.0.5``) are
+applied per viewer. A viewer that falls behind the ring is told how many
+events it missed. Reconnecting browsers resume from ``Last-Event-ID``, and an
+ID from before a dashboard restart replays the buffered events.
+
+Endpoints: ``/`` (page), ``/events`` (SSE stream), ``/stats`` (JSON counters).
+"""
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .store import normalize_user_id
+
+RATE_WINDOW = 60
+HEARTBEAT_SECONDS = 15
+
+def event_to_json(event):
+    """JSON-friendly copy of a live capture event"""
+    return {key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in event.items()}
+
+class EventHub:
+    """Fan-out ring buffer of live events with per-machine rate counters"""
+
+    def __init__(self, size=1000):
+        self.ring = deque(maxlen=size)
+        self.next_seq = 1
+        self.condition = threading.Condition()
+        self.totals = defaultdict(int)
+        self.recent = defaultdict(deque)
+        self.last_event = {}
+        self.started_at = time.time()
+
+    def __call__(self, event_data):
+        """Live capture listener"""
+        data = event_to_json(event_data)
+        now = time.time()
+        with self.condition:
+            self.ring.append((self.next_seq, data))
+            self.next_seq += 1
+            machine = data['machine']
+            self.totals[machine] += 1
+            self.recent[machine].append(now)
+            self.last_event[machine] = data['timestamp']
+            self.condition.notify_all()
+
+    def read_after(self, cursor, timeout):
+        """Wait for events after ``cursor``, return (events, missed, new cursor)
+
+        A cursor ahead of the hub comes from a browser that saw an earlier
+        hub (the dashboard was restarted), so it restarts from the buffer start.
+        """
+        with self.condition:
+            if cursor > self.next_seq - 1:
+                cursor = 0
+            if self.next_seq - 1 <= cursor:
+                self.condition.wait(timeout)
+            if not self.ring or self.next_seq - 1 <= cursor:
+                return [], 0, cursor
+            oldest = self.ring[0][0]
+            missed = max(0, oldest - cursor - 1)
+            start = max(0, cursor + 1 - oldest)
+            events = [self.ring[i] for i in range(start, len(self.ring))]
+            return events, missed, self.next_seq - 1
+
+    def stats(self):
+        """Per-machine totals and events per minute over the last RATE_WINDOW seconds"""
+        cutoff = time.time() - RATE_WINDOW
+        with self.condition:
+            machines = {}
+            for machine, stamps in self.recent.items():
+                while stamps and stamps[0] < cutoff:
+                    stamps.popleft()
+                machines[machine] = {
+                    'total': self.totals[machine],
+                    'per_minute': len(stamps) * 60 / RATE_WINDOW,
+                    'last_event': self.last_event.get(machine),
+                }
+            return {'uptime_seconds': round(time.time() - self.started_at),
+                    'buffered': len(self.ring), 'latest_seq': self.next_seq - 1,
+                    'machines': machines}
+
+def _split(values):
+    return {value.strip() for item in values for value in item.split(',') if value.strip()}
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """Serves the page, the SSE stream and the stats of ``server.hub``"""
+
+    def log_message(self, format, *args):
+        pass  # Keep the terminal for live events
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/':
+            self._send(200, 'text/html; charset=utf-8', PAGE.encode('utf-8'))
+        elif url.path == '/stats':
+            self._send(200, 'application/json', json.dumps(self.server.hub.stats()).encode('utf-8'))
+        elif url.path == '/events':
+            self._stream(parse_qs(url.query))
+        else:
+            self._send(404, 'text/plain', b'Not found')
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, query):
+        hub = self.server.hub
+        users = {normalize_user_id(user) for user in _split(query.get('user', []))}
+        machines = _split(query.get('machine', []))
+        last_id = self.headers.get('Last-Event-ID')
+        cursor = int(last_id) if last_id and last_id.isdigit() else hub.next_seq - 1
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        self.end_headers()
+        try:
+            while not self.server.stopping.is_set():
+                events, missed, cursor = hub.read_after(cursor, HEARTBEAT_SECONDS)
+                chunks = []
+                if missed:
+                    chunks.append(f"event: gap\ndata: {missed}\n\n")
+                for seq, data in events:
+                    if users and normalize_user_id(data['user_id']) not in users:
+                        continue
+                    if machines and data['machine'] not in machines:
+                        continue
+                    chunks.append(f"id: {seq}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n")
+                if not chunks:
+                    chunks.append(": heartbeat\n\n")  # Also detects closed connections
+                self.wfile.write(''.join(chunks).encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def serve_dashboard(hub, host='127.0.0.1', port=8080):
+    """Start the dashboard HTTP server in a background thread, return the server"""
+    server = ThreadingHTTPServer((host, port), DashboardHandler)
+    server.daemon_threads = True
+    server.hub = hub
+    server.stopping = threading.Event()
+    threading.Thread(target=server.serve_forever, name='dashboard', daemon=True).start()
+    return server
+
+def stop_dashboard(server):
+    server.stopping.set()
+    server.shutdown()
+    server.server_close()
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>ZK live events</title>
+<style>
+body{font-family:sans-serif;margin:1em}table{border-collapse:collapse}
+td,th{padding:2px 10px;text-align:left}tr:nth-child(even){background:#f2f2f2}
+#rates td{font-variant-numeric:tabular-nums}
+</style></head><body>
+<h2>ZK live events</h2>
+<form id="filters">User IDs <input name="user" placeholder="1258,1301">
+Machines <input name="machine" placeholder="192.168.1.100"> <button>Apply</button></form>
+<h3>Devices</h3>
+<table id="rates"><tr><th>Machine</th><th>Events/min</th><th>Total</th><th>Last event</th></tr></table>
+<h3>Events <small id="status"></small></h3>
+<table><thead><tr><th>Captured</th><th>Machine</th><th>User ID</th><th>Time</th><th>Status</th><th>Punch</th></tr></thead>
+<tbody id="events"></tbody></table>
+<script>
+const MAX_ROWS = 500;
+let source = null;
+function connect() {
+  if (source) source.close();
+  const params = new URLSearchParams(new FormData(document.getElementById('filters')));
+  for (const [key, value] of [...params]) if (!value) params.delete(key);
+  source = new EventSource('/events?' + params);
+  source.onopen = () => document.getElementById('status').textContent = 'connected';
+  source.onerror = () => document.getElementById('status').textContent = 'reconnecting...';
+  source.addEventListener('gap', e => document.getElementById('status').textContent = e.data + ' events missed');
+  source.onmessage = e => {
+    const ev = JSON.parse(e.data), row = document.createElement('tr');
+    for (const value of [ev.captured_at, ev.machine, ev.user_id, ev.timestamp, ev.status, ev.punch]) {
+      const cell = document.createElement('td'); cell.textContent = value; row.appendChild(cell);
+    }
+    const body = document.getElementById('events');
+    body.insertBefore(row, body.firstChild);
+    while (body.rows.length > MAX_ROWS) body.deleteRow(-1);
+  };
+}
+async function refreshRates() {
+  const stats = await (await fetch('/stats')).json(), table = document.getElementById('rates');
+  while (table.rows.length > 1) table.deleteRow(1);
+  for (const [machine, s] of Object.entries(stats.machines)) {
+    const row = table.insertRow();
+    for (const value of [machine, s.per_minute.toFixed(1), s.total, s.last_event || '']) row.insertCell().textContent = value;
+  }
+}
+document.getElementById('filters').onsubmit = e => { e.preventDefault(); connect(); };
+connect(); refreshRates(); setInterval(refreshRates, 2000);
+</script></body></html>
+"""
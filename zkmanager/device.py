@@ -0,0 +1,378 @@
+"""Device session helpers and single-machine operations"""
+from datetime import datetime
+
+from zk import ZK
+from zk.finger import Finger
+
+from .attlog import iter_attendance
+from .config import machines
+from .health import known_dead
+from .profiling import machine_of, phase_timer
+from .views import show
+
+# pyzk pings a machine before connecting; the socket load test turns this off
+# for its loopback devices (scripts/load_test_live_capture.py)
+PING_FIRST = True
+
+def connect_machine(ip, port=4370, timeout=5):
+    """Connect to a ZK machine, unless the health map says it is down"""
+    dead = known_dead(ip)
+    if dead:
+        print(f"⏭️ Skipping {ip}: down since {dead['since'][:19]} (health check, --ignore-health to force)")
+        return None
+    try:
+        with phase_timer.phase(ip, 'connect'):
+            zk = ZK(ip, port=port, timeout=timeout, ommit_ping=not PING_FIRST)
+            conn = zk.connect()
+        conn.machine_ip = ip
+        print(f"✓ Connected to machine: {ip}")
+        return conn
+    except Exception as e:
+        print(f"✗ Failed to connect to {ip}: {e}")
+        return None
+
+def disconnect_machine(conn):
+    """Disconnect from ZK machine"""
+    if conn:
+        conn.disconnect()
+        print("✓ Disconnected from machine")
+
+# ==================== ATTENDANCE FUNCTIONS ====================
+
+def get_attendance_logs(conn, user_id=None, since=None, until=None):
+    """Get attendance logs from the machine, optionally for one user and/or a time range"""
+    try:
+        machine = machine_of(conn)
+        # Records are decoded and filtered as they are transferred
+        with phase_timer.phase(machine, 'transfer'):
+            attendance = list(iter_attendance(conn, since, until, user_id))
+        filtered = bool(user_id or since or until)
+        with phase_timer.phase(machine, 'render'):
+            show(attendance, 'attendance', machine=machine)
+            if filtered:
+                print(f"Found {len(attendance)} records" + (f" for user {user_id}" if user_id else ""))
+            else:
+                print(f"Total attendance records: {len(attendance)}")
+        return attendance
+    except Exception as e:
+        print(f"Error getting attendance: {e}")
+        return []
+
+def clear_attendance_logs(conn):
+    """Clear all attendance logs"""
+    try:
+        conn.clear_attendance()
+        print("✓ Attendance logs cleared")
+    except Exception as e:
+        print(f"Error clearing attendance: {e}")
+
+# ==================== USER MANAGEMENT FUNCTIONS ====================
+
+def get_users(conn, user_id=None):
+    """Get all users or specific user"""
+    try:
+        machine = machine_of(conn)
+        with phase_timer.phase(machine, 'transfer'):
+            users = conn.get_users()
+        if user_id:
+            with phase_timer.phase(machine, 'parse'):
+                filtered_users = [user for user in users 
+                                if user.user_id == user_id or user.user_id == str(user_id) or user.user_id == f"0{user_id}"]
+            with phase_timer.phase(machine, 'render'):
+                show(filtered_users, 'user', machine=machine)
+                print(f"Found {len(filtered_users)} users with ID {user_id}")
+        else:
+            with phase_timer.phase(machine, 'render'):
+                show(users, 'user', machine=machine)
+                print(f"Total users: {len(users)}")
+        return users
+    except Exception as e:
+        print(f"Error getting users: {e}")
+        return []
+
+def set_user(conn, uid, name, privilege=0, password='', group_id='', user_id='', card=0):
+    """Add or update a user"""
+    try:
+        conn.set_user(uid=uid, name=name, privilege=privilege, password=password, 
+                     group_id=group_id, user_id=user_id, card=card)
+        print(f"✓ User {name} (ID: {uid}) added/updated")
+    except Exception as e:
+        print(f"Error setting user: {e}")
+
+def delete_user(conn, uid):
+    """Delete a user"""
+    try:
+        conn.delete_user(uid=uid)
+        print(f"✓ User {uid} deleted")
+    except Exception as e:
+        print(f"Error deleting user: {e}")
+
+def clear_users(conn):
+    """Clear all users"""
+    try:
+        conn.clear_users()
+        print("✓ All users cleared")
+    except Exception as e:
+        print(f"Error clearing users: {e}")
+
+# ==================== FINGERPRINT FUNCTIONS ====================
+
+def get_templates(conn, user_id=None):
+    """Get fingerprint templates"""
+    try:
+        machine = machine_of(conn)
+        with phase_timer.phase(machine, 'transfer'):
+            templates = conn.get_templates()
+        if user_id:
+            with phase_timer.phase(machine, 'parse'):
+                filtered_templates = [template for template in templates if template.uid == user_id]
+            with phase_timer.phase(machine, 'render'):
+                show(filtered_templates, 'template', machine=machine)
+                print(f"Found {len(filtered_templates)} templates for user {user_id}")
+        else:
+            with phase_timer.phase(machine, 'render'):
+                show(templates, 'template', machine=machine)
+                print(f"Total templates: {len(templates)}")
+        return templates
+    except Exception as e:
+        print(f"Error getting templates: {e}")
+        return []
+
+def clear_templates(conn):
+    """Clear all fingerprint templates"""
+    try:
+        conn.clear_templates()
+        print("✓ All templates cleared")
+    except Exception as e:
+        print(f"Error clearing templates: {e}")
+
+def save_template(conn, uid, fid, template_data, valid=1):
+    """Save a fingerprint template"""
+    try:
+        template = Finger(uid=uid, fid=fid, valid=valid, template=template_data)
+        conn.save_template(template)
+        print(f"✓ Template saved for user {uid}, finger {fid}")
+    except Exception as e:
+        print(f"Error saving template: {e}")
+
+def delete_template(conn, uid, fid=None):
+    """Delete fingerprint template(s)"""
+    try:
+        if fid is not None:
+            conn.delete_template(uid, fid)
+            print(f"✓ Template deleted for user {uid}, finger {fid}")
+        else:
+            # Delete all templates for user
+            templates = conn.get_templates()
+            user_templates = [t for t in templates if t.uid == uid]
+            for template in user_templates:
+                conn.delete_template(uid, template.fid)
+            print(f"✓ All templates deleted for user {uid}")
+    except Exception as e:
+        print(f"Error deleting template: {e}")
+
+# ==================== DEVICE INFO FUNCTIONS ====================
+
+def get_device_info(conn, machine_ip):
+    """Get comprehensive device information"""
+    try:
+        print("=== DEVICE INFORMATION ===")
+        print(f"Machine IP: {machine_ip}")
+        
+        # Basic info
+        device_name = conn.get_device_name()
+        print(f"Device Name: {device_name}")
+        
+        is_connected = conn.is_connect
+        print(f"Is Connected: {is_connected}")
+        
+        # Firmware and version info
+        firmware_version = conn.get_firmware_version()
+        print(f"Firmware Version: {firmware_version}")
+        
+        # Serial number
+        serial_number = conn.get_serialnumber()
+        print(f"Serial Number: {serial_number}")
+        
+        # Platform
+        platform = conn.get_platform()
+        print(f"Platform: {platform}")
+        
+        # Device name
+        device_name = conn.get_device_name()
+        print(f"Device Name: {device_name}")
+        
+        # Face algorithm version (if supported)
+        try:
+            face_version = conn.get_face_version()
+            print(f"Face Algorithm Version: {face_version}")
+        except:
+            print("Face Algorithm Version: Not supported")
+            
+        # Fingerprint algorithm version (if supported)  
+        try:
+            fp_version = conn.get_fp_version()
+            print(f"Fingerprint Algorithm Version: {fp_version}")
+        except:
+            print("Fingerprint Algorithm Version: Not supported")
+            
+    except Exception as e:
+        print(f"Error getting device info: {e}")
+
+def get_device_time(conn):
+    """Get device time"""
+    try:
+        device_time = conn.get_time()
+        print(f"Device Time: {device_time}")
+        return device_time
+    except Exception as e:
+        print(f"Error getting device time: {e}")
+
+def set_device_time(conn, timestamp=None):
+    """Set device time"""
+    try:
+        if timestamp is None:
+            timestamp = datetime.now()
+        conn.set_time(timestamp)
+        print(f"✓ Device time set to: {timestamp}")
+    except Exception as e:
+        print(f"Error setting device time: {e}")
+
+# ==================== SYSTEM FUNCTIONS ====================
+
+def restart_device(conn):
+    """Restart the device"""
+    try:
+        conn.restart()
+        print("✓ Device restart initiated")
+    except Exception as e:
+        print(f"Error restarting device: {e}")
+
+def power_off_device(conn):
+    """Power off the device"""
+    try:
+        conn.poweroff()
+        print("✓ Device power off initiated")
+    except Exception as e:
+        print(f"Error powering off device: {e}")
+
+def enable_device(conn):
+    """Enable device (unlock)"""
+    try:
+        conn.enable_device()
+        print("✓ Device enabled")
+    except Exception as e:
+        print(f"Error enabling device: {e}")
+
+def disable_device(conn):
+    """Disable device (lock)"""
+    try:
+        conn.disable_device()
+        print("✓ Device disabled")
+    except Exception as e:
+        print(f"Error disabling device: {e}")
+
+def refresh_data(conn):
+    """Refresh data on device"""
+    try:
+        conn.refresh_data()
+        print("✓ Device data refreshed")
+    except Exception as e:
+        print(f"Error refreshing data: {e}")
+
+def test_voice(conn, index=0):
+    """Test device voice"""
+    try:
+        conn.test_voice(index)
+        print(f"✓ Voice test {index} played")
+    except Exception as e:
+        print(f"Error testing voice: {e}")
+
+# ==================== ACCESS CONTROL FUNCTIONS ====================
+
+def set_tz_info(conn, tz_id, start_time, end_time):
+    """Set timezone information"""
+    try:
+        # This is a simplified example - actual implementation may vary
+        print(f"Setting timezone {tz_id} from {start_time} to {end_time}")
+        # conn.set_tz_info would be implemented here
+    except Exception as e:
+        print(f"Error setting timezone info: {e}")
+
+# ==================== MACHINE CHECK FUNCTIONS ====================
+
+def on_get_log():
+    """Get attendance logs for specific user"""
+    zk = ZK('192.168.9.229', port=4370, timeout=5)
+    conn = zk.connect()
+    if conn:
+        get_attendance_logs(conn, user_id=1258)
+        conn.disconnect()
+
+def on_get_users(machine):
+    """Get users from a specific machine"""
+    zk = ZK(machine, port=4370, timeout=5)
+    conn = zk.connect()
+    if conn:
+        get_users(conn, user_id=1258)
+        print("=================================================")
+        print(f"Machine: {machine}")
+        conn.disconnect()
+
+def on_get_all():
+    """Get users from all machines"""
+    for machine in machines:
+        conn = connect_machine(machine)
+        if conn:
+            get_users(conn)
+            disconnect_machine(conn)
+
+def on_check_machine(machine):
+    """Check machine status and info"""
+    conn = connect_machine(machine)
+    if conn:
+        get_device_info(conn, machine)
+        disconnect_machine(conn)
+
+def comprehensive_machine_check(machine):
+    """Perform comprehensive check of a machine, returning record counts or None"""
+    print(f"\n{'='*50}")
+    print(f"COMPREHENSIVE CHECK FOR MACHINE: {machine}")
+    print(f"{'='*50}")
+    
+    conn = connect_machine(machine)
+    if not conn:
+        return None
+    
+    try:
+        # Device information
+        get_device_info(conn, machine)
+        
+        # Time information
+        get_device_time(conn)
+        
+        # User count
+        users = get_users(conn)
+        
+        # Attendance count
+        attendance = get_attendance_logs(conn)
+        
+        # Template count
+        templates = get_templates(conn)
+        
+        print(f"\nSUMMARY:")
+        print(f"Users: {len(users) if users else 0}")
+        print(f"Attendance Records: {len(attendance) if attendance else 0}")
+        print(f"Fingerprint Templates: {len(templates) if templates else 0}")
+        
+        return {
+            'users': len(users) if users else 0,
+            'attendance': len(attendance) if attendance else 0,
+            'templates': len(templates) if templates else 0,
+        }
+    except Exception as e:
+        print(f"Error during comprehensive check: {e}")
+        return None
+    finally:
+        disconnect_machine(conn)
+
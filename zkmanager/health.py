@@ -0,0 +1,199 @@
+"""Cheap reachability heartbeat for all target machines
+
+A probe opens a TCP connection to the device port and sends a single
+CMD_CONNECT packet. If the reply carries a ZK header (ACK_OK or ACK_UNAUTH),
+the probe closes the session again with CMD_EXIT. When TCP is refused or
+times out, the same ping is tried over UDP. There is no user, log or
+template transfer, so a probe costs one round trip and a short timeout.
+
+Results are kept in ``<store>/health.json``: current status per machine, the
+time of the last status change, consecutive failures and a bounded history of
+(time, up, latency). ``connect_machine`` consults it and skips machines that
+a recent probe found down, instead of waiting on a full connect timeout.
+"""
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from struct import pack, unpack
+
+from . import store
+
+CMD_CONNECT = 1000
+CMD_EXIT = 1001
+CMD_ACK_OK = 2000
+CMD_ACK_UNAUTH = 2005
+USHRT_MAX = 65535
+TCP_MAGIC = (0x5050, 0x7282)
+
+HISTORY_LIMIT = 100
+# A down status is trusted for this long after the probe that found it
+MAX_AGE = 300
+# Consecutive failed probes before connect_machine skips a machine
+MIN_FAILURES = 2
+# Set to False (--ignore-health) to always attempt connections
+SKIP_DEAD = True
+# Store whose health.json the connect gate reads (--store), None = default store
+STORE_DIR = None
+
+def _checksum(data):
+    """zkemsdk checksum of a packet (same arithmetic as pyzk)"""
+    if len(data) % 2:
+        data += b'\x00'
+    checksum = 0
+    for (word,) in (unpack('<H', data[i:i + 2]) for i in range(0, len(data), 2)):
+        checksum += word
+        if checksum > USHRT_MAX:
+            checksum -= USHRT_MAX
+    checksum = ~checksum
+    while checksum < 0:
+        checksum += USHRT_MAX
+    return checksum
+
+def zk_packet(command, session_id=0, reply_id=USHRT_MAX - 1, payload=b''):
+    """Build a ZK command packet (without the TCP top header)"""
+    # The checksum covers the previous reply ID, the packet carries the next one
+    checksum = _checksum(pack('<4H', command, 0, session_id, reply_id) + payload)
+    reply_id = (reply_id + 1) % USHRT_MAX
+    return pack('<4H', command, checksum, session_id, reply_id) + payload
+
+def _tcp_top(packet):
+    return pack('<HHI', TCP_MAGIC[0], TCP_MAGIC[1], len(packet)) + packet
+
+def _probe_tcp(ip, port, timeout):
+    with socket.create_connection((ip, port), timeout=timeout) as sock:
+        sock.settimeout(timeout)
+        sock.sendall(_tcp_top(zk_packet(CMD_CONNECT)))
+        reply = sock.recv(64)
+        if len(reply) < 16 or unpack('<HH', reply[:4]) != TCP_MAGIC:
+            raise ConnectionError("not a ZK device (invalid TCP reply)")
+        code, _, session_id, reply_id = unpack('<4H', reply[8:16])
+        if code in (CMD_ACK_OK, CMD_ACK_UNAUTH):
+            # Release the session so the device does not wait for it to expire
+            sock.sendall(_tcp_top(zk_packet(CMD_EXIT, session_id, reply_id)))
+        return code
+
+def _probe_udp(ip, port, timeout):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.sendto(zk_packet(CMD_CONNECT), (ip, port))
+        reply = sock.recv(64)
+        if len(reply) < 8:
+            raise ConnectionError("not a ZK device (short UDP reply)")
+        code, _, session_id, reply_id = unpack('<4H', reply[:8])
+        if code in (CMD_ACK_OK, CMD_ACK_UNAUTH):
+            sock.sendto(zk_packet(CMD_EXIT, session_id, reply_id), (ip, port))
+        return code
+
+def probe(machine, port=4370, timeout=1.0):
+    """Probe one machine, return a result dict"""
+    result = {'machine': machine, 'checked_at': datetime.now().isoformat(),
+              'up': False, 'transport': None, 'latency_ms': None, 'error': None}
+    errors = []
+    for transport, probe_func in (('tcp', _probe_tcp), ('udp', _probe_udp)):
+        start = time.perf_counter()
+        try:
+            code = probe_func(machine, port, timeout)
+        except (OSError, ConnectionError) as e:
+            errors.append(f"{transport}: {e}")
+            result['error'] = ", ".join(errors)
+            continue
+        result.update(up=code in (CMD_ACK_OK, CMD_ACK_UNAUTH), transport=transport,
+                      latency_ms=round((time.perf_counter() - start) * 1000, 1),
+                      error=None if code in (CMD_ACK_OK, CMD_ACK_UNAUTH) else f"reply code {code}")
+        break
+    return result
+
+# ==================== HEALTH MAP ====================
+
+def health_path(store_dir=None):
+    return os.path.join(store.store_root(store_dir), 'health.json')
+
+class HealthMap:
+    """Persisted per-machine status and probe history"""
+
+    def __init__(self, store_dir=None):
+        self.store_dir = store_dir
+        self.machines = store.read_json(health_path(store_dir), {})
+
+    def record(self, result):
+        """Fold a probe result into the map"""
+        status = 'up' if result['up'] else 'down'
+        entry = self.machines.setdefault(result['machine'], {'status': None, 'history': []})
+        if entry['status'] != status:
+            entry['status'] = status
+            entry['since'] = result['checked_at']
+        entry['last_checked'] = result['checked_at']
+        entry['latency_ms'] = result['latency_ms']
+        entry['transport'] = result['transport']
+        entry['error'] = result['error']
+        entry['failures'] = 0 if result['up'] else entry.get('failures', 0) + 1
+        entry['history'] = (entry['history'] + [[result['checked_at'], result['up'],
+                                                 result['latency_ms']]])[-HISTORY_LIMIT:]
+
+    def save(self):
+        os.makedirs(store.store_root(self.store_dir), exist_ok=True)
+        store.write_json_atomic(health_path(self.store_dir), self.machines)
+
+    def print_map(self, machines=None):
+        """Print status, latency and availability over the kept history"""
+        print(f"\n{'Machine':<18} {'Status':<8} {'Latency':>9} {'Via':<4} {'Avail':>6}  Since")
+        print("-" * 72)
+        for machine in machines or sorted(self.machines):
+            entry = self.machines.get(machine)
+            if not entry:
+                print(f"{machine:<18} {'unknown':<8}")
+                continue
+            history = entry['history']
+            available = sum(1 for _, up, _ in history if up) / len(history) if history else 0
+            latency = f"{entry['latency_ms']:.1f}ms" if entry['latency_ms'] is not None else '-'
+            icon = "🟢" if entry['status'] == 'up' else "🔴"
+            print(f"{machine:<18} {icon} {entry['status']:<5} {latency:>9} {entry['transport'] or '-':<4} "
+                  f"{available:>6.0%}  {entry['since'][:19]}"
+                  + (f"  ({entry['error']})" if entry['status'] == 'down' and entry['error'] else ""))
+
+def probe_all(machines, store_dir=None, workers=32, timeout=1.0, port=4370):
+    """Probe all machines concurrently, record the results, return the HealthMap"""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(machines)))) as pool:
+        results = list(pool.map(lambda machine: probe(machine, port, timeout), machines))
+    health = HealthMap(store_dir)
+    for result in results:
+        health.record(result)
+    health.save()
+    return health
+
+def monitor(machines, interval=30, **kwargs):
+    """Probe all machines every ``interval`` seconds until Ctrl+C"""
+    try:
+        while True:
+            start = time.time()
+            health = probe_all(machines, **kwargs)
+            up = sum(1 for machine in machines if health.machines[machine]['status'] == 'up')
+            print(f"\n💓 {datetime.now():%H:%M:%S} {up}/{len(machines)} machine(s) up")
+            health.print_map(machines)
+            time.sleep(max(0, interval - (time.time() - start)))
+    except KeyboardInterrupt:
+        print("\n🛑 Health monitor stopped")
+
+# ==================== CONNECT GATE ====================
+
+_cache = {'path': None, 'mtime': None, 'machines': {}}
+
+def known_dead(machine, store_dir=None):
+    """Return the health entry if a recent probe found the machine down, else None"""
+    if not SKIP_DEAD:
+        return None
+    path = health_path(store_dir or STORE_DIR)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if (path, mtime) != (_cache['path'], _cache['mtime']):
+        _cache['machines'] = store.read_json(path, {})
+        _cache['path'], _cache['mtime'] = path, mtime
+    entry = _cache['machines'].get(machine)
+    if not entry or entry['status'] != 'down' or entry.get('failures', 0) < MIN_FAILURES:
+        return None
+    age = (datetime.now() - datetime.fromisoformat(entry['last_checked'])).total_seconds()
+    return entry if age <= MAX_AGE else None
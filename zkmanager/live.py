@@ -0,0 +1,427 @@
+"""Live capture of attendance events across target machines"""
+import threading
+import time
+from datetime import datetime
+
+from .config import machines
+from .checkpoint import load_checkpoint, make_checkpoint, resume_position, save_checkpoint
+from .device import connect_machine, disconnect_machine
+from .profiling import phase_timer
+
+class _DeviceCapture:
+    """Capture state of one machine
+
+    Only the machine's worker thread appends to ``events``; readers copy or
+    swap the list under ``lock``, so no event is lost or seen twice.
+    """
+
+    def __init__(self, machine_ip):
+        self.machine_ip = machine_ip
+        self.lock = threading.Lock()
+        self.events = []
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def active(self):
+        return self.running and not self.stop_event.is_set()
+
+class LiveCaptureManager:
+    """Manager for live capture functionality across multiple machines"""
+    
+    def __init__(self, use_checkpoints=True, connect=None, disconnect=None, poll_interval=2,
+                 echo=True, start_delay=0.1):
+        # Guards the device registry and the listener list, never held during I/O
+        self.lock = threading.Lock()
+        self.devices = {}
+        # Resume each device after its last delivered event across restarts
+        self.use_checkpoints = use_checkpoints
+        # connect(machine_ip, timeout=...) -> connection; simulators plug in here
+        self.connect = connect or connect_machine
+        self.disconnect = disconnect or disconnect_machine
+        self.poll_interval = poll_interval
+        self.echo = echo
+        # Pause between starting machines in start_live_capture_all
+        self.start_delay = start_delay
+        # Callbacks receiving every event of every machine (shared pipeline)
+        self.listeners = []
+    
+    def add_listener(self, listener):
+        """Subscribe a callback to events from all running captures"""
+        with self.lock:
+            self.listeners = self.listeners + [listener]
+    
+    def remove_listener(self, listener):
+        """Unsubscribe a callback added with add_listener"""
+        with self.lock:
+            self.listeners = [existing for existing in self.listeners if existing is not listener]
+    
+    def is_active(self, machine_ip):
+        """Whether a capture is running for a machine and not being stopped"""
+        with self.lock:
+            device = self.devices.get(machine_ip)
+        return device is not None and device.active
+    
+    def snapshot(self):
+        """Return {machine: [events]}, a consistent copy per machine"""
+        with self.lock:
+            devices = list(self.devices.values())
+        result = {}
+        for device in devices:
+            with device.lock:
+                result[device.machine_ip] = list(device.events)
+        return result
+    
+    def clear_data(self):
+        """Drop captured events and return them as {machine: [events]}"""
+        with self.lock:
+            devices = list(self.devices.values())
+        drained = {}
+        for device in devices:
+            with device.lock:
+                drained[device.machine_ip], device.events = device.events, []
+        return drained
+        
+    def start_live_capture_single(self, machine_ip, duration=None, callback=None):
+        """Start live capture for a single machine"""
+        with self.lock:
+            device = self.devices.get(machine_ip)
+            if device is not None and device.running:
+                if device.active:
+                    print(f"⚠️ Live capture already running for {machine_ip}")
+                else:
+                    print(f"⚠️ Live capture for {machine_ip} is still stopping, try again")
+                return False
+            if device is None:
+                device = self.devices[machine_ip] = _DeviceCapture(machine_ip)
+            device.stop_event.clear()
+            device.thread = threading.Thread(
+                target=self._live_capture_worker,
+                args=(device, duration, callback),
+                name=f"live-{machine_ip}",
+                daemon=True,
+            )
+            device.thread.start()
+        
+        print(f"✅ Live capture started for {machine_ip}")
+        return True
+    
+    def start_live_capture_all(self, duration=None, callback=None):
+        """Start live capture for all machines"""
+        print(f"🚀 Starting live capture for all {len(machines)} machines...")
+        started_count = 0
+        
+        for machine in machines:
+            if self.start_live_capture_single(machine, duration, callback):
+                started_count += 1
+                time.sleep(self.start_delay)  # Small delay to avoid overwhelming
+        
+        print(f"✅ Live capture started for {started_count}/{len(machines)} machines")
+        return started_count
+    
+    def stop_live_capture(self, machine_ip=None, wait=True, timeout=10):
+        """Stop live capture for specific machine or all machines, joining the workers"""
+        with self.lock:
+            if machine_ip:
+                device = self.devices.get(machine_ip)
+                if device is None or not device.running:
+                    print(f"⚠️ No active capture for {machine_ip}")
+                    return
+                devices = [device]
+                print(f"🛑 Stopping live capture for {machine_ip}")
+            else:
+                devices = [device for device in self.devices.values() if device.running]
+                print("🛑 Stopping all live captures...")
+            for device in devices:
+                device.stop_event.set()
+        
+        if wait:
+            deadline = time.time() + timeout
+            for device in devices:
+                device.thread.join(max(0, deadline - time.time()))
+                if device.thread.is_alive():
+                    print(f"⚠️ Live capture for {device.machine_ip} did not stop within {timeout}s")
+    
+    def get_capture_status(self):
+        """Get status of all live captures"""
+        with self.lock:
+            states = {machine: device.active for machine, device in self.devices.items()}
+        counts = {machine: len(events) for machine, events in self.snapshot().items()}
+        active_captures = sum(1 for active in states.values() if active)
+        total_events = sum(counts.values())
+        
+        print(f"\n📊 LIVE CAPTURE STATUS:")
+        print(f"Active captures: {active_captures}")
+        print(f"Total events captured: {total_events}")
+        
+        for machine, active in states.items():
+            status = "🟢 ACTIVE" if active else "🔴 STOPPED"
+            print(f"  {machine}: {status} ({counts.get(machine, 0)} events)")
+    
+    def deliver(self, device, new_events, callback=None):
+        """Record events of one capture device, then dispatch them"""
+        with device.lock:
+            device.events.extend(new_events)
+        self.dispatch(device.machine_ip, new_events, callback)
+    
+    def dispatch(self, machine_ip, new_events, callback=None):
+        """Echo events of one machine and hand them to the callback and listeners
+        
+        Capture workers reach this through ``deliver``. Replays (see
+        replay.py) call it directly: their events only go to the consumers and
+        are not kept in the per-machine capture buffers.
+        """
+        handlers = ([callback] if callback else []) + self.listeners
+        for event_data in new_events:
+            # Print real-time event
+            if self.echo:
+                print(f"🔔 LIVE EVENT [{machine_ip}] - "
+                      f"User: {event_data['user_id']} | "
+                      f"Time: {event_data['timestamp'].strftime('%H:%M:%S')} | "
+                      f"Status: {event_data['status']}")
+            
+            # Call custom callback and shared listeners
+            for handler in handlers:
+                try:
+                    handler(event_data)
+                except Exception as e:
+                    print(f"⚠️ Callback error: {e}")
+    
+    def _live_capture_worker(self, device, duration, callback):
+        """Worker thread for live capture"""
+        machine_ip = device.machine_ip
+        stop_event = device.stop_event
+        start_time = time.time()
+        checkpoint = load_checkpoint(machine_ip) if self.use_checkpoints else None
+        serial = None
+        first_poll = True
+        
+        print(f"🔴 Starting live monitoring for {machine_ip}")
+        
+        while not stop_event.is_set():
+            try:
+                # Check duration limit
+                if duration and (time.time() - start_time) > duration:
+                    print(f"⏰ Duration limit reached for {machine_ip}")
+                    break
+                
+                # Connect to machine
+                conn = self.connect(machine_ip, timeout=3)
+                if not conn:
+                    stop_event.wait(5)  # Wait before retry
+                    continue
+                
+                try:
+                    if serial is None:
+                        serial = conn.get_serialnumber()
+                    
+                    # Get current attendance
+                    with phase_timer.phase(machine_ip, 'transfer'):
+                        attendance = conn.get_attendance()
+                finally:
+                    self.disconnect(conn)
+                
+                # New records start right after the last delivered one; on the
+                # first poll (or if the log was cleared) the checkpoint decides
+                position, reason = resume_position(checkpoint, serial, attendance)
+                if checkpoint is None or position != checkpoint['position']:
+                    print(f"📍 {machine_ip}: {reason}")
+                    checkpoint = make_checkpoint(machine_ip, serial, position,
+                                                 attendance[position - 1] if position else None)
+                    if self.use_checkpoints:
+                        save_checkpoint(checkpoint)
+                elif first_poll:
+                    print(f"📍 {machine_ip}: {reason}")
+                first_poll = False
+                
+                # Check for new records
+                if len(attendance) > position:
+                    captured_at = datetime.now()
+                    new_events = [{
+                        'machine': machine_ip,
+                        'timestamp': record.timestamp,
+                        'user_id': record.user_id,
+                        'status': record.status,
+                        'punch': record.punch,
+                        'captured_at': captured_at,
+                    } for record in attendance[position:]]
+                    
+                    self.deliver(device, new_events, callback)
+                    
+                    # Checkpoint only after the whole batch was delivered
+                    checkpoint = make_checkpoint(machine_ip, serial, len(attendance), attendance[-1])
+                    if self.use_checkpoints:
+                        save_checkpoint(checkpoint)
+                
+                # Wait before next check (returns at once when stopped)
+                stop_event.wait(self.poll_interval)
+                
+            except Exception as e:
+                print(f"❌ Error in live capture for {machine_ip}: {e}")
+                stop_event.wait(5)
+        
+        print(f"🔴 Live capture stopped for {machine_ip}")
+
+# Global live capture manager
+live_manager = LiveCaptureManager()
+
+def start_live_capture(machine_ip=None, duration=None, show_users=True):
+    """Start live capture with optional user resolution"""
+    
+    def event_callback(event_data):
+        """Callback to process live events"""
+        if show_users:
+            # Try to get user name
+            try:
+                conn = connect_machine(event_data['machine'], timeout=2)
+                if conn:
+                    users = conn.get_users()
+                    user_name = "Unknown"
+                    
+                    for user in users:
+                        if (user.user_id == event_data['user_id'] or 
+                            user.user_id == str(event_data['user_id'])):
+                            user_name = user.name
+                            break
+                    
+                    print(f"👤 User Name: {user_name}")
+                    disconnect_machine(conn)
+            except:
+                pass  # Don't let user resolution errors stop live capture
+    
+    if machine_ip:
+        return live_manager.start_live_capture_single(machine_ip, duration, event_callback)
+    else:
+        return live_manager.start_live_capture_all(duration, event_callback)
+
+def stop_live_capture(machine_ip=None):
+    """Stop live capture"""
+    live_manager.stop_live_capture(machine_ip)
+
+def live_capture_status():
+    """Show live capture status"""
+    live_manager.get_capture_status()
+
+def live_capture_interactive():
+    """Interactive live capture session"""
+    print("\n" + "="*60)
+    print("🔴 LIVE CAPTURE SESSION")
+    print("="*60)
+    print("Commands:")
+    print("  start <ip>     - Start capture for specific machine")
+    print("  start all      - Start capture for all machines") 
+    print("  stop <ip>      - Stop capture for specific machine")
+    print("  stop all       - Stop all captures")
+    print("  status         - Show capture status")
+    print("  export         - Export captured data")
+    print("  clear          - Clear captured data")
+    print("  quit           - Exit live capture")
+    print("="*60)
+    
+    while True:
+        try:
+            command = input("\n[LIVE] Enter command: ").strip().lower()
+            
+            if command == "quit" or command == "exit":
+                stop_live_capture()  # Stop all captures
+                break
+            
+            elif command.startswith("start "):
+                target = command.split(" ", 1)[1]
+                if target == "all":
+                    start_live_capture()
+                else:
+                    start_live_capture(target)
+            
+            elif command.startswith("stop "):
+                target = command.split(" ", 1)[1]
+                if target == "all":
+                    stop_live_capture()
+                else:
+                    stop_live_capture(target)
+            
+            elif command == "status":
+                live_capture_status()
+            
+            elif command == "export":
+                export_live_data()
+            
+            elif command == "clear":
+                clear_live_data()
+            
+            elif command == "help":
+                print("Available commands: start, stop, status, export, clear, quit")
+            
+            else:
+                print("Unknown command. Type 'help' for available commands.")
+                
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping all live captures...")
+            stop_live_capture()
+            break
+        except Exception as e:
+            print(f"Error: {e}")
+
+def export_live_data(filename=None):
+    """Export captured live data to file"""
+    capture_data = live_manager.snapshot()
+    if not any(capture_data.values()):
+        print("⚠️ No live data to export")
+        return
+    
+    if not filename:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"live_capture_{timestamp}.txt"
+    
+    try:
+        with open(filename, 'w') as f:
+            f.write("LIVE CAPTURE DATA EXPORT\n")
+            f.write(f"Exported at: {datetime.now()}\n")
+            f.write("="*50 + "\n\n")
+            
+            total_events = 0
+            for machine, events in capture_data.items():
+                if events:
+                    f.write(f"MACHINE: {machine}\n")
+                    f.write("-" * 30 + "\n")
+                    
+                    for event in events:
+                        f.write(f"Time: {event['timestamp']} | "
+                               f"User: {event['user_id']} | "
+                               f"Status: {event['status']} | "
+                               f"Punch: {event['punch']}\n")
+                        total_events += 1
+                    
+                    f.write("\n")
+            
+            f.write(f"\nTotal Events: {total_events}\n")
+        
+        print(f"✅ Live data exported to: {filename}")
+        print(f"Total events exported: {total_events}")
+        
+    except Exception as e:
+        print(f"❌ Error exporting data: {e}")
+
+def clear_live_data():
+    """Clear all captured live data"""
+    confirm = input("Are you sure you want to clear all live data? (yes/no): ")
+    if confirm.lower() == 'yes':
+        cleared = live_manager.clear_data()
+        print(f"✅ Live data cleared ({sum(len(events) for events in cleared.values())} events)")
+    else:
+        print("❌ Clear operation cancelled")
+
+def monitor_specific_user_live(user_id, duration=None):
+    """Monitor specific user across all machines in real-time"""
+    from .watchlist import Watchlist, monitor_watchlist
+    
+    print(f"\n🔍 MONITORING USER {user_id} LIVE")
+    print("="*50)
+    
+    watchlist = Watchlist()
+    watchlist.add(user_id, label="TARGET USER")
+    monitor_watchlist(watchlist, duration)
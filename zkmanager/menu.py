@@ -0,0 +1,252 @@
+"""Interactive menu for testing functions"""
+from .backup import backup_machine
+from .config import machines, set_target_machines, show_current_targets
+from .device import (connect_machine, disconnect_machine, get_attendance_logs, get_users,
+                     get_templates, set_user, delete_user, clear_attendance_logs,
+                     set_device_time, enable_device, disable_device, on_check_machine,
+                     comprehensive_machine_check)
+from .search import (find_user_in_all_machines, find_user_with_attendance, search_users_by_name,
+                     find_users_batch, read_user_ids)
+from .live import (start_live_capture, stop_live_capture, live_capture_status,
+                   live_capture_interactive, monitor_specific_user_live)
+from .watchlist import Watchlist, monitor_watchlist
+
+def interactive_menu():
+    """Interactive menu for testing functions"""
+    while True:
+        print("\n" + "="*50)
+        print("ZK ATTENDANCE MACHINE MANAGER")
+        print("="*50)
+        print(f"📡 Current targets: {len(machines)} machine(s)")
+        print("="*50)
+        print("0. Show/Change target machines")
+        print("1. Get attendance logs")
+        print("2. Get users")
+        print("3. Get device info")
+        print("4. Comprehensive machine check")
+        print("5. Get fingerprint templates")
+        print("6. Add new user")
+        print("7. Delete user")
+        print("8. Clear attendance logs")
+        print("9. Set device time")
+        print("10. Enable/Disable device")
+        print("11. Test all machines")
+        print("12. 🔍 Find user by ID in all machines")
+        print("13. 🔍 Find user by name in all machines") 
+        print("14. 🔍 Find user with attendance records")
+        print("15. 🔍 Search users by name pattern")
+        print("16. 🔴 Start live capture (single machine)")
+        print("17. 🔴 Start live capture (all machines)")
+        print("18. 🔴 Interactive live capture session")
+        print("19. 🎯 Monitor specific user live")
+        print("20. 📊 Live capture status")
+        print("21. 🛑 Stop live capture")
+        print("22. 🔍 Batch lookup of user IDs")
+        print("23. 🎯 Monitor watchlist live")
+        print("24. 🪪 Find users by card, privilege or group")
+        print("25. Exit")
+        
+        choice = input("\nEnter your choice: ")
+        
+        if choice == "0":
+            show_current_targets()
+            new_targets = input("Enter new target IPs (comma-separated, or press Enter to keep current): ").strip()
+            if new_targets:
+                set_target_machines(new_targets)
+        elif choice == "1":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            user_id = input("Enter user ID (optional): ")
+            conn = connect_machine(ip)
+            if conn:
+                get_attendance_logs(conn, int(user_id) if user_id else None)
+                disconnect_machine(conn)
+        
+        elif choice == "2":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            user_id = input("Enter user ID (optional): ")
+            conn = connect_machine(ip)
+            if conn:
+                get_users(conn, int(user_id) if user_id else None)
+                disconnect_machine(conn)
+        
+        elif choice == "3":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            on_check_machine(ip)
+        
+        elif choice == "4":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            comprehensive_machine_check(ip)
+        
+        elif choice == "5":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            user_id = input("Enter user ID (optional): ")
+            conn = connect_machine(ip)
+            if conn:
+                get_templates(conn, int(user_id) if user_id else None)
+                disconnect_machine(conn)
+        
+        elif choice == "6":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            uid = int(input("Enter user UID: "))
+            name = input("Enter user name: ")
+            privilege = int(input("Enter privilege (0=User, 1=Admin): ") or "0")
+            password = input("Enter password (optional): ")
+            conn = connect_machine(ip)
+            if conn:
+                set_user(conn, uid, name, privilege, password)
+                disconnect_machine(conn)
+        
+        elif choice == "7":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            uid = int(input("Enter user UID to delete: "))
+            conn = connect_machine(ip)
+            if conn:
+                delete_user(conn, uid)
+                disconnect_machine(conn)
+        
+        elif choice == "8":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            confirm = input("Are you sure you want to clear all attendance logs? (yes/no): ")
+            if confirm.lower() == 'yes':
+                if input("Back up the machine first? (Y/n): ").lower() != 'n':
+                    if not backup_machine(ip):
+                        print("❌ Backup failed, attendance logs not cleared")
+                        continue
+                conn = connect_machine(ip)
+                if conn:
+                    clear_attendance_logs(conn)
+                    disconnect_machine(conn)
+        
+        elif choice == "9":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            conn = connect_machine(ip)
+            if conn:
+                set_device_time(conn)
+                disconnect_machine(conn)
+        
+        elif choice == "10":
+            ip = input("Enter machine IP (default: 192.168.9.229): ") or "192.168.9.229"
+            action = input("Enter action (enable/disable): ")
+            conn = connect_machine(ip)
+            if conn:
+                if action.lower() == 'enable':
+                    enable_device(conn)
+                else:
+                    disable_device(conn)
+                disconnect_machine(conn)
+        
+        elif choice == "11":
+            for machine in machines:
+                comprehensive_machine_check(machine)
+        
+        elif choice == "12":
+            user_id = input("Enter user ID to search: ")
+            if user_id:
+                try:
+                    # Try to convert to int, but also search as string
+                    find_user_in_all_machines(int(user_id), "user_id")
+                except ValueError:
+                    find_user_in_all_machines(user_id, "user_id")
+        
+        elif choice == "13":
+            name = input("Enter user name to search: ")
+            if name:
+                find_user_in_all_machines(name, "name")
+        
+        elif choice == "14":
+            user_id = input("Enter user ID to search with attendance: ")
+            days = input("Enter days back to search (default: 30): ") or "30"
+            if user_id:
+                try:
+                    find_user_with_attendance(int(user_id), int(days))
+                except ValueError:
+                    find_user_with_attendance(user_id, int(days))
+        
+        elif choice == "15":
+            pattern = input("Enter name pattern to search: ")
+            partial = input("Use partial matching? (y/n, default: y): ").lower() != 'n'
+            if pattern:
+                search_users_by_name(pattern, partial)
+        
+        elif choice == "16":
+            ip = input("Enter machine IP: ")
+            duration_str = input("Enter duration in seconds (optional): ")
+            duration = int(duration_str) if duration_str else None
+            show_users = input("Show user names? (y/n, default: y): ").lower() != 'n'
+            
+            if ip:
+                print(f"🔴 Starting live capture for {ip}...")
+                start_live_capture(ip, duration, show_users)
+                if duration:
+                    print(f"⏰ Live capture will run for {duration} seconds")
+                else:
+                    print("⏰ Live capture running indefinitely. Use option 21 to stop.")
+        
+        elif choice == "17":
+            duration_str = input("Enter duration in seconds (optional): ")
+            duration = int(duration_str) if duration_str else None
+            show_users = input("Show user names? (y/n, default: y): ").lower() != 'n'
+            
+            print(f"🔴 Starting live capture for all machines...")
+            start_live_capture(None, duration, show_users)
+            if duration:
+                print(f"⏰ Live capture will run for {duration} seconds")
+            else:
+                print("⏰ Live capture running indefinitely. Use option 21 to stop.")
+        
+        elif choice == "18":
+            live_capture_interactive()
+        
+        elif choice == "19":
+            user_id = input("Enter user ID to monitor: ")
+            duration_str = input("Enter duration in seconds (optional): ")
+            duration = int(duration_str) if duration_str else None
+            
+            if user_id:
+                try:
+                    monitor_specific_user_live(int(user_id), duration)
+                except ValueError:
+                    monitor_specific_user_live(user_id, duration)
+        
+        elif choice == "20":
+            live_capture_status()
+        
+        elif choice == "21":
+            print("Stop options:")
+            print("1. Stop specific machine")
+            print("2. Stop all machines")
+            stop_choice = input("Choose option (1-2): ")
+            
+            if stop_choice == "1":
+                ip = input("Enter machine IP to stop: ")
+                stop_live_capture(ip)
+            elif stop_choice == "2":
+                stop_live_capture()
+            else:
+                print("Invalid choice")
+        elif choice == "22":
+            source = input("Enter user IDs (comma-separated) or path to a file of IDs: ").strip()
+            days = input("Include attendance from the last N days (optional): ")
+            if source:
+                find_users_batch(read_user_ids(source), int(days) if days else None)
+        
+        elif choice == "23":
+            path = input("Enter watchlist file (user_id,label,rule per line): ").strip()
+            duration_str = input("Enter duration in seconds (optional): ")
+            duration = int(duration_str) if duration_str else None
+            if path:
+                try:
+                    monitor_watchlist(Watchlist(path), duration)
+                except (OSError, ValueError) as e:
+                    print(f"❌ Cannot load watchlist: {e}")
+        
+        elif choice == "24":
+            field = {'1': 'card', '2': 'privilege', '3': 'group_id'}.get(
+                input("Search by 1) card number 2) privilege (user/admin/number) 3) group ID: ").strip())
+            value = input("Enter value: ").strip()
+            if field and value:
+                find_user_in_all_machines(value, field)
+        
+        elif choice == "25":
+            stop_live_capture()  # Stop any running captures
+            break
@@ -0,0 +1,92 @@
+"""K-way merge of per-device attendance streams into one deduplicated timeline
+
+Each device stream must be in time order (``reorder`` fixes small local
+disorder with a bounded buffer). Streams are merged lazily through a heap
+holding one pending event per device, so memory stays bounded by the number
+of devices plus the events sharing the current timestamp, which is all the
+deduplication needs since duplicates always carry the same timestamp.
+"""
+import heapq
+
+def attendance_event(record, machine, serial=None):
+    """Convert a pyzk Attendance or stored record dict to a timeline event"""
+    if isinstance(record, dict):
+        return {
+            'machine': record.get('machine', machine),
+            'serial': record.get('serial', serial),
+            'timestamp': record['timestamp'],
+            'user_id': record['user_id'],
+            'status': record.get('status'),
+            'punch': record.get('punch'),
+            'uid': record.get('uid'),
+        }
+    return {
+        'machine': machine,
+        'serial': serial,
+        'timestamp': record.timestamp,
+        'user_id': record.user_id,
+        'status': record.status,
+        'punch': record.punch,
+        'uid': record.uid,
+    }
+
+def event_key(event):
+    """Identity of a punch: (device serial, user_id, timestamp, punch)"""
+    return (event.get('serial') or event['machine'], str(event['user_id']),
+            event['timestamp'], event['punch'])
+
+def device_stream(records, machine, serial=None):
+    """Yield timeline events for one device's records"""
+    for record in records:
+        yield attendance_event(record, machine, serial)
+
+def reorder(events, window=1000):
+    """Yield events in time order, tolerating disorder within ``window`` events"""
+    heap = []
+    for seq, event in enumerate(events):
+        heapq.heappush(heap, (event['timestamp'], seq, event))
+        if len(heap) > window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+def merge_timelines(streams, dedupe=True, stats=None):
+    """Yield events from several time-ordered streams in global time order
+
+    ``stats``, if given, is a dict updated with 'merged' and 'duplicates'
+    counts as the timeline is consumed.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('merged', 0)
+    stats.setdefault('duplicates', 0)
+
+    heap = []
+    iterators = [iter(stream) for stream in streams]
+    for index, iterator in enumerate(iterators):
+        event = next(iterator, None)
+        if event is not None:
+            heap.append((event['timestamp'], index, event))
+    heapq.heapify(heap)
+
+    current_timestamp = None
+    seen = set()
+    while heap:
+        timestamp, index, event = heap[0]
+        following = next(iterators[index], None)
+        if following is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (following['timestamp'], index, following))
+
+        if dedupe:
+            if timestamp != current_timestamp:
+                current_timestamp = timestamp
+                seen.clear()
+            key = event_key(event)
+            if key in seen:
+                stats['duplicates'] += 1
+                continue
+            seen.add(key)
+        stats['merged'] += 1
+        yield event
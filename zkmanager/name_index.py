@@ -0,0 +1,242 @@
+"""Fleet-wide, accent-insensitive fuzzy index of user names, plus attribute indexes
+
+Names are folded (Unicode NFKD, combining marks dropped, đ -> d, lower case,
+collapsed whitespace) so "Nguyen Van A" finds "Nguyễn Văn A". Lookups go
+through a trigram index and a token-prefix index instead of scanning every
+user, and results are ranked by how well the folded names match.
+
+Card number, privilege level and group ID are indexed as exact-match
+postings, so a badge or admin audit is a dict lookup instead of a scan.
+
+The index is built from the user lists cached by ``sync`` and persisted as
+JSON next to them. ``refresh`` only re-indexes machines whose cached list changed.
+"""
+import os
+import unicodedata
+from collections import defaultdict
+
+from . import store
+
+INDEX_FILE = 'name_index.json'
+INDEX_VERSION = 2
+MAX_PREFIX = 8
+ATTRIBUTE_FIELDS = ('card', 'privilege', 'group_id')
+# Privilege levels by name (0 and 14 are standard, 2 and 6 exist on some firmwares)
+PRIVILEGE_NAMES = {'user': 0, 'enroller': 2, 'manager': 6, 'admin': 14}
+
+def fold_name(name):
+    """Fold a name for accent- and case-insensitive comparison"""
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = name.replace('đ', 'd').replace('Đ', 'D')
+    return ' '.join(name.lower().split())
+
+def attribute_key(field, value):
+    """Canonical index key of a card, privilege or group ID value, None if unset"""
+    text = str(value if value is not None else '').strip()
+    if field == 'privilege':
+        text = str(PRIVILEGE_NAMES.get(text.lower(), text))
+    if field in ('card', 'privilege'):
+        text = text.lstrip('0') or ('0' if text else '')
+    if field == 'card' and text == '0':
+        return None  # No card enrolled
+    return text or None
+
+def trigrams(folded):
+    """Trigrams of a folded name, padded so short names still index"""
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameIndex:
+    """Trigram and prefix index over cached user lists of all machines"""
+
+    def __init__(self):
+        self.entries = {}
+        self.next_id = 0
+        self.by_machine = defaultdict(set)
+        self.signatures = {}
+        self.grams = defaultdict(set)
+        self.prefixes = defaultdict(set)
+        self.attributes = {field: defaultdict(set) for field in ATTRIBUTE_FIELDS}
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ==================== MAINTENANCE ====================
+
+    def add_user(self, machine, user):
+        """Index one cached user dict of a machine"""
+        folded = fold_name(user.get('name'))
+        entry_id = self.next_id
+        self.next_id += 1
+        self.entries[entry_id] = (machine, user, folded)
+        self.by_machine[machine].add(entry_id)
+        for gram in trigrams(folded):
+            self.grams[gram].add(entry_id)
+        for token in folded.split():
+            for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                self.prefixes[token[:length]].add(entry_id)
+        for field in ATTRIBUTE_FIELDS:
+            key = attribute_key(field, user.get(field))
+            if key is not None:
+                self.attributes[field][key].add(entry_id)
+
+    def remove_machine(self, machine):
+        """Drop every entry of a machine"""
+        for entry_id in self.by_machine.pop(machine, set()):
+            _, user, folded = self.entries.pop(entry_id)
+            for field in ATTRIBUTE_FIELDS:
+                key = attribute_key(field, user.get(field))
+                if key is not None:
+                    self._discard(self.attributes[field], key, entry_id)
+            for gram in trigrams(folded):
+                self._discard(self.grams, gram, entry_id)
+            for token in folded.split():
+                for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                    self._discard(self.prefixes, token[:length], entry_id)
+        self.signatures.pop(machine, None)
+
+    @staticmethod
+    def _discard(postings, key, entry_id):
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del postings[key]
+
+    def refresh(self, store_dir=None):
+        """Re-index machines whose cached user list changed, return their count"""
+        changed = 0
+        stored = set(store.stored_machines(store_dir))
+        for machine in set(self.signatures) - stored:
+            self.remove_machine(machine)
+            changed += 1
+        for machine in stored:
+            signature = store.load_meta(machine, store_dir).get('users_synced_at')
+            if signature is None or self.signatures.get(machine) == signature:
+                continue
+            self.remove_machine(machine)
+            for user in store.load_users(machine, store_dir) or []:
+                self.add_user(machine, user)
+            self.signatures[machine] = signature
+            changed += 1
+        return changed
+
+    # ==================== LOOKUP ====================
+
+    def search(self, query, limit=20, min_score=0.5, exact=False, machines=None):
+        """Return [(score, machine, user)] best matches first"""
+        folded = fold_name(query)
+        if not folded:
+            return []
+
+        if exact:
+            tokens = folded.split()
+            candidates = set.intersection(*(self.prefixes.get(token[:MAX_PREFIX], set())
+                                            for token in tokens))
+            matches = [(1.0, entry_id) for entry_id in candidates
+                       if self.entries[entry_id][2] == folded]
+        else:
+            query_grams = trigrams(folded)
+            overlap = defaultdict(int)
+            for gram in query_grams:
+                for entry_id in self.grams.get(gram, ()):
+                    overlap[entry_id] += 1
+            for token in folded.split():
+                for entry_id in self.prefixes.get(token[:MAX_PREFIX], ()):
+                    overlap.setdefault(entry_id, 0)
+            matches = []
+            for entry_id, shared in overlap.items():
+                score = self._score(folded, query_grams, shared, self.entries[entry_id][2])
+                if score >= min_score:
+                    matches.append((score, entry_id))
+
+        results = []
+        for score, entry_id in matches:
+            machine, user, _ = self.entries[entry_id]
+            if machines is None or machine in machines:
+                results.append((score, machine, user))
+        results.sort(key=lambda result: (-result[0], result[2].get('name') or '', result[1]))
+        return results[:limit] if limit else results
+
+    def lookup(self, field, value, machines=None):
+        """Return [(machine, user)] whose card, privilege or group_id equals value"""
+        key = attribute_key(field, value)
+        if key is None:
+            return []
+        results = [self.entries[entry_id][:2] for entry_id in self.attributes[field].get(key, ())]
+        if machines is not None:
+            results = [result for result in results if result[0] in machines]
+        results.sort(key=lambda result: (result[0], store.normalize_user_id(result[1]['user_id']).zfill(12)))
+        return results
+
+    @staticmethod
+    def _score(folded, query_grams, shared, candidate):
+        """Rank a candidate: exact > substring > token prefixes > trigram similarity"""
+        if candidate == folded:
+            return 1.0
+        if folded in candidate:
+            return 0.9
+        candidate_tokens = candidate.split()
+        if all(any(ct.startswith(qt) for ct in candidate_tokens) for qt in folded.split()):
+            return 0.8
+        # Dice coefficient of trigram sets, scaled below the structural matches
+        return 0.75 * (2.0 * shared / (len(query_grams) + len(trigrams(candidate))))
+
+# ==================== PERSISTENCE ====================
+
+def _postings_to_json(postings):
+    return {key: sorted(ids) for key, ids in postings.items()}
+
+def _postings_from_json(data):
+    return defaultdict(set, {key: set(ids) for key, ids in data.items()})
+
+def index_to_json(index):
+    """JSON-friendly form of an index"""
+    return {
+        'version': INDEX_VERSION,
+        'next_id': index.next_id,
+        'signatures': index.signatures,
+        'entries': {str(entry_id): list(entry) for entry_id, entry in index.entries.items()},
+        'grams': _postings_to_json(index.grams),
+        'prefixes': _postings_to_json(index.prefixes),
+        'attributes': {field: _postings_to_json(postings)
+                       for field, postings in index.attributes.items()},
+    }
+
+def index_from_json(data):
+    """Rebuild an index from index_to_json output, raising on any other layout"""
+    if data.get('version') != INDEX_VERSION:
+        raise ValueError(f"index version {data.get('version')}, expected {INDEX_VERSION}")
+    index = NameIndex()
+    index.next_id = data['next_id']
+    index.signatures = data['signatures']
+    for entry_id, (machine, user, folded) in data['entries'].items():
+        index.entries[int(entry_id)] = (machine, user, folded)
+        index.by_machine[machine].add(int(entry_id))
+    index.grams = _postings_from_json(data['grams'])
+    index.prefixes = _postings_from_json(data['prefixes'])
+    index.attributes = {field: _postings_from_json(data['attributes'][field])
+                        for field in ATTRIBUTE_FIELDS}
+    return index
+
+def load_index(store_dir=None):
+    """Load the persisted index and bring it up to date with the store"""
+    path = os.path.join(store.store_root(store_dir), INDEX_FILE)
+    try:
+        data = store.read_json(path)
+        index = index_from_json(data) if data is not None else NameIndex()
+    except Exception as e:
+        # Corrupt, partially written or an older version: rebuild from the cached user lists
+        print(f"⚠️ Rebuilding name index ({e})")
+        index = NameIndex()
+
+    if index.refresh(store_dir):
+        save_index(index, store_dir)
+    return index
+
+def save_index(index, store_dir=None):
+    """Persist the index next to the cached user lists"""
+    root = store.store_root(store_dir)
+    os.makedirs(root, exist_ok=True)
+    store.write_json_atomic(os.path.join(root, INDEX_FILE), index_to_json(index))
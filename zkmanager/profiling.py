@@ -0,0 +1,137 @@
+"""Per-phase timing and whole-command profiling
+
+``phase_timer`` is always on and cheap (one perf_counter pair and a lock per
+phase). It breaks time down per device into connect, transfer (device I/O and
+pyzk decoding), parse (our own record processing) and render (console
+output) so a slow fleet check shows where the time went.
+
+``profile_command`` runs a command under cProfile, writing a ``.pstats``
+file, while a sampling thread records the stacks of every thread into a
+``.folded`` file (collapsed stacks for flamegraph.pl or speedscope).
+"""
+import cProfile
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+PHASES = ('connect', 'transfer', 'parse', 'render')
+
+class PhaseTimer:
+    """Thread-safe accumulator of time spent per device and phase"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    @contextmanager
+    def phase(self, machine, name):
+        """Time the enclosed block as phase ``name`` of ``machine``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(machine, name, time.perf_counter() - start)
+
+    def record(self, machine, name, seconds):
+        with self.lock:
+            self.seconds[(machine, name)] += seconds
+            self.calls[(machine, name)] += 1
+
+    def reset(self):
+        with self.lock:
+            self.seconds.clear()
+            self.calls.clear()
+
+    def rows(self):
+        """Return [(machine, {phase: seconds}, total)] sorted by total time"""
+        with self.lock:
+            per_machine = defaultdict(dict)
+            for (machine, name), seconds in self.seconds.items():
+                per_machine[machine][name] = seconds
+        rows = [(machine, phases, sum(phases.values())) for machine, phases in per_machine.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def print_summary(self):
+        """Print a per-device phase breakdown table"""
+        rows = self.rows()
+        if not rows:
+            return
+        names = list(PHASES) + sorted({name for _, phases, _ in rows for name in phases} - set(PHASES))
+        print(f"\n⏱️ PHASE TIMINGS (seconds):")
+        print(f"{'Machine':<18}" + "".join(f"{name:>10}" for name in names) + f"{'total':>10}")
+        print("-" * (18 + 10 * (len(names) + 1)))
+        for machine, phases, total in rows:
+            print(f"{str(machine):<18}" + "".join(f"{phases.get(name, 0):>10.3f}" for name in names)
+                  + f"{total:>10.3f}")
+
+# Global phase timer shared by all commands
+phase_timer = PhaseTimer()
+
+def machine_of(conn):
+    """Machine IP recorded on a connection by connect_machine"""
+    return getattr(conn, 'machine_ip', 'unknown')
+
+# ==================== SAMPLING PROFILER ====================
+
+class StackSampler:
+    """Sample the stacks of all threads and count collapsed stack strings"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = defaultdict(int)
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while self.running:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.counts[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def write_folded(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+def profile_command(func, prefix, *args):
+    """Run func(*args) under cProfile and the stack sampler, writing <prefix>.pstats/.folded"""
+    profiler = cProfile.Profile()
+    sampler = StackSampler()
+    sampler.start()
+    profiler.enable()
+    try:
+        return func(*args)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        profiler.dump_stats(f"{prefix}.pstats")
+        sampler.write_folded(f"{prefix}.folded")
+
+        print(f"\n🔬 PROFILE (top 15 by cumulative time):")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+        print(f"✅ Profile written to: {prefix}.pstats (pstats), {prefix}.folded (flame graph)")
@@ -0,0 +1,155 @@
+"""Capacity-aware attendance log rotation: archive, verify, then clear
+
+A device is rotated when its attendance log passes a fill ratio of its
+record capacity (or an absolute record count). Rotation disables the device
+so no punch can land between download and clear. It then downloads the log
+and writes it to a gzip JSON-lines archive in the local store (and appends it
+to the store's attendance). The archive is read back to check record count
+and sha256, the device count is checked again, and only then is the log
+cleared. Any mismatch aborts without clearing.
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from . import store
+
+ROTATIONS_DIR = 'rotations'
+
+def _record_line(record):
+    return (json.dumps(store.attendance_to_dict(record), ensure_ascii=False) + "\n").encode('utf-8')
+
+def log_usage(conn):
+    """Return (records, capacity) of the device attendance log"""
+    conn.read_sizes()
+    return conn.records, getattr(conn, 'rec_cap', 0)
+
+def needs_rotation(records, capacity, threshold, max_records=None):
+    """Whether a log with this size should be rotated"""
+    if max_records and records >= max_records:
+        return True
+    return bool(capacity) and records / capacity >= threshold
+
+def write_rotation_archive(machine, serial, records, store_dir=None):
+    """Write records to a gzip JSON-lines archive, return (path, count, sha256)"""
+    directory = os.path.join(store.device_dir(machine, store_dir, create=True), ROTATIONS_DIR)
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{serial or 'unknown'}_{datetime.now():%Y%m%d_%H%M%S}")
+    path, n = f"{base}.jsonl.gz", 1
+    while os.path.exists(path):
+        path, n = f"{base}_{n}.jsonl.gz", n + 1
+    digest = hashlib.sha256()
+    tmp_path = f"{path}.partial"
+    with gzip.open(tmp_path, 'wb') as f:
+        for record in records:
+            line = _record_line(record)
+            digest.update(line)
+            f.write(line)
+    os.replace(tmp_path, path)
+    return path, len(records), digest.hexdigest()
+
+def verify_rotation_archive(path):
+    """Read an archive back, return (count, sha256)"""
+    digest = hashlib.sha256()
+    count = 0
+    with gzip.open(path, 'rb') as f:
+        for line in f:
+            digest.update(line)
+            count += 1
+    return count, digest.hexdigest()
+
+def rotate_machine(machine, threshold=0.8, max_records=None, force=False, dry_run=False,
+                   store_dir=None):
+    """Rotate one machine's attendance log if needed, return a result dict"""
+    from .device import connect_machine, disconnect_machine
+
+    conn = connect_machine(machine)
+    if not conn:
+        return {'machine': machine, 'status': 'unreachable'}
+
+    disabled = False
+    try:
+        records, capacity = log_usage(conn)
+        usage = f"{records}/{capacity}" if capacity else f"{records}"
+        if not force and not needs_rotation(records, capacity, threshold, max_records):
+            print(f"  ⭕ {machine}: {usage} records, below threshold")
+            return {'machine': machine, 'status': 'below_threshold', 'records': records}
+        if dry_run:
+            print(f"  🧪 {machine}: {usage} records, would rotate")
+            return {'machine': machine, 'status': 'dry_run', 'records': records}
+
+        # No punches may land between download and clear
+        conn.disable_device()
+        disabled = True
+
+        serial = conn.get_serialnumber()
+        attendance = conn.get_attendance()
+        if len(attendance) != records:
+            records, _ = log_usage(conn)
+            if len(attendance) != records:
+                print(f"  ❌ {machine}: downloaded {len(attendance)} records but device reports {records}")
+                return {'machine': machine, 'status': 'count_mismatch'}
+
+        path, count, checksum = write_rotation_archive(machine, serial, attendance, store_dir)
+        verified_count, verified_checksum = verify_rotation_archive(path)
+        if (verified_count, verified_checksum) != (count, checksum):
+            print(f"  ❌ {machine}: archive verification failed, log not cleared ({path})")
+            return {'machine': machine, 'status': 'verify_failed', 'archive': path}
+        store.append_attendance(machine, attendance, store_dir)
+
+        if log_usage(conn)[0] != count:
+            print(f"  ❌ {machine}: log changed during rotation, not cleared")
+            return {'machine': machine, 'status': 'log_changed', 'archive': path}
+
+        conn.clear_attendance()
+        remaining, _ = log_usage(conn)
+
+        meta = store.load_meta(machine, store_dir)
+        meta.setdefault('rotations', []).append({
+            'rotated_at': datetime.now().isoformat(),
+            'archive': os.path.basename(path),
+            'records': count,
+            'sha256': checksum,
+            'remaining': remaining,
+        })
+        store.save_meta(machine, meta, store_dir)
+
+        print(f"  ✅ {machine}: archived {count} records ({checksum[:12]}) to {path}, "
+              f"log cleared ({remaining} remaining)")
+        return {'machine': machine, 'status': 'rotated', 'records': count,
+                'archive': path, 'sha256': checksum}
+    except Exception as e:
+        print(f"  ❌ {machine}: rotation failed: {e}")
+        return {'machine': machine, 'status': 'error', 'error': str(e)}
+    finally:
+        if disabled:
+            try:
+                conn.enable_device()
+            except Exception as e:
+                print(f"  ⚠️ {machine}: could not re-enable device: {e}")
+        disconnect_machine(conn)
+
+def rotate_all(machines, threshold=0.8, max_records=None, force=False, dry_run=False,
+               store_dir=None):
+    """Rotate every machine that needs it, return {machine: result}"""
+    print(f"🗄️ Checking attendance log usage on {len(machines)} machine(s) "
+          f"(threshold {threshold:.0%}{f', max {max_records} records' if max_records else ''})...")
+    results = {machine: rotate_machine(machine, threshold, max_records, force, dry_run, store_dir)
+               for machine in machines}
+    rotated = [result for result in results.values() if result['status'] == 'rotated']
+    print(f"\n📋 ROTATION SUMMARY: {len(rotated)} machine(s) rotated, "
+          f"{sum(result['records'] for result in rotated)} records archived")
+    return results
+
+def rotation_job(machines, interval, **kwargs):
+    """Run rotate_all every ``interval`` seconds until Ctrl+C"""
+    try:
+        while True:
+            rotate_all(machines, **kwargs)
+            print(f"⏰ Next rotation check in {interval} seconds... Press Ctrl+C to stop")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n🛑 Rotation job stopped")
@@ -0,0 +1,302 @@
+"""User search across all target machines"""
+import os
+from collections import deque
+from datetime import datetime, timedelta
+
+from .attlog import iter_attendance
+from .config import machines
+from .device import connect_machine, disconnect_machine
+from .merge import device_stream, merge_timelines
+from .name_index import ATTRIBUTE_FIELDS, attribute_key, fold_name, load_index, save_index
+from .profiling import phase_timer
+from .views import show
+from . import store
+
+def find_user_in_machine(machine, user_id, search_type="user_id"):
+    """Find a specific user in a machine"""
+    conn = connect_machine(machine)
+    if not conn:
+        return None
+    
+    try:
+        with phase_timer.phase(machine, 'transfer'):
+            users = conn.get_users()
+        found_users = []
+        
+        for user in users:
+            if search_type == "user_id":
+                # Search by user_id with different formats
+                if (user.user_id == user_id or 
+                    user.user_id == str(user_id) or 
+                    user.user_id == f"0{user_id}" or
+                    user.user_id == f"{user_id:05d}"):  # Zero-padded format
+                    found_users.append(user)
+            elif search_type == "name":
+                # Search by name (case and accent insensitive partial match)
+                if fold_name(user_id) in fold_name(user.name):
+                    found_users.append(user)
+            elif search_type == "uid":
+                # Search by UID
+                if user.uid == user_id or user.uid == int(user_id):
+                    found_users.append(user)
+            elif search_type in ATTRIBUTE_FIELDS:
+                # Search by card number, privilege level or group ID
+                wanted = attribute_key(search_type, user_id)
+                if wanted is not None and attribute_key(search_type, getattr(user, search_type)) == wanted:
+                    found_users.append(user)
+        
+        return found_users
+    except Exception as e:
+        print(f"Error searching users in {machine}: {e}")
+        return None
+    finally:
+        disconnect_machine(conn)
+
+def find_user_in_all_machines(user_id, search_type="user_id"):
+    """Find a user across all machines"""
+    print(f"\n{'='*60}")
+    print(f"SEARCHING FOR USER: {user_id} (Search Type: {search_type.upper()})")
+    print(f"{'='*60}")
+    
+    total_found = 0
+    results = {}
+    
+    # Name, card, privilege and group searches are answered from the cached index where possible
+    index = load_index() if search_type == "name" or search_type in ATTRIBUTE_FIELDS else None
+    
+    for machine in machines:
+        print(f"\n🔍 Searching in machine: {machine}")
+        if index is not None and machine in index.signatures:
+            if search_type == "name":
+                cached = [user for _, _, user in index.search(user_id, limit=None, machines={machine})]
+            else:
+                cached = [user for _, user in index.lookup(search_type, user_id, machines={machine})]
+            found_users = [store.cached_user(user) for user in cached]
+            print(f"  📂 Answered from cached user list")
+        else:
+            found_users = find_user_in_machine(machine, user_id, search_type)
+        
+        if found_users is None:
+            print(f"  ❌ Failed to connect to {machine}")
+            results[machine] = "CONNECTION_FAILED"
+        elif len(found_users) == 0:
+            print(f"  ⭕ No users found in {machine}")
+            results[machine] = "NOT_FOUND"
+        else:
+            print(f"  ✅ Found {len(found_users)} user(s) in {machine}:")
+            results[machine] = found_users
+            total_found += len(found_users)
+            
+            with phase_timer.phase(machine, 'render'):
+                show(found_users, 'user', machine=machine)
+    
+    print(f"\n{'='*60}")
+    print(f"SEARCH SUMMARY")
+    print(f"{'='*60}")
+    print(f"Total users found: {total_found}")
+    print(f"Machines searched: {len(machines)}")
+    
+    # Show summary by machine status
+    connected = sum(1 for result in results.values() if result not in ["CONNECTION_FAILED", "NOT_FOUND"])
+    failed = sum(1 for result in results.values() if result == "CONNECTION_FAILED")
+    not_found = sum(1 for result in results.values() if result == "NOT_FOUND")
+    
+    print(f"Connected machines: {connected}")
+    print(f"Failed connections: {failed}")
+    print(f"Machines without user: {not_found}")
+    
+    return results
+
+def find_user_with_attendance(user_id, days_back=30):
+    """Find user and their recent attendance across all machines"""
+    print(f"\n{'='*60}")
+    print(f"SEARCHING USER {user_id} WITH ATTENDANCE (Last {days_back} days)")
+    print(f"{'='*60}")
+    
+    # First find the user
+    user_results = find_user_in_all_machines(user_id, "user_id")
+    
+    # Then get attendance from machines where user was found
+    cutoff_date = datetime.now() - timedelta(days=days_back)
+    
+    total_attendance = 0
+    streams = []
+    
+    for machine, result in user_results.items():
+        if isinstance(result, list) and len(result) > 0:
+            print(f"\n📊 Getting attendance from {machine}:")
+            conn = connect_machine(machine)
+            if conn:
+                try:
+                    serial = conn.get_serialnumber()
+                    # Only this user's recent records are kept while the log streams in
+                    user_attendance = list(iter_attendance(conn, since=cutoff_date, user_id=user_id))
+                    
+                    if user_attendance:
+                        print(f"  ✅ Found {len(user_attendance)} attendance records")
+                        
+                        # Sort by timestamp for the cross-device merge
+                        user_attendance.sort(key=lambda x: x.timestamp)
+                        streams.append(device_stream(user_attendance, machine, serial))
+                    else:
+                        print(f"  ⭕ No recent attendance records")
+                        
+                except Exception as e:
+                    print(f"  ❌ Error getting attendance: {e}")
+                finally:
+                    disconnect_machine(conn)
+    
+    # One time-ordered, deduplicated timeline across all machines
+    stats = {}
+    recent = deque(merge_timelines(streams, stats=stats), maxlen=10)
+    total_attendance = stats['merged']
+    
+    if recent:
+        print(f"\n🕒 Most recent punches across all machines:")
+        for i, event in enumerate(reversed(recent)):
+            print(f"    {i+1:2d}. {event['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} - "
+                  f"Machine: {event['machine']} - Status: {event['status']} - Punch: {event['punch']}")
+        if total_attendance > len(recent):
+            print(f"    ... and {total_attendance - len(recent)} more records")
+    
+    print(f"\n📈 ATTENDANCE SUMMARY:")
+    print(f"Total attendance records found: {total_attendance}")
+    print(f"Duplicate records skipped: {stats['duplicates']}")
+    return total_attendance
+
+def parse_user_ids(text):
+    """Split user IDs given one per line or comma-separated, skipping # comments"""
+    return [user_id.strip() for user_id in text.replace(',', '\n').splitlines()
+            if user_id.strip() and not user_id.strip().startswith('#')]
+
+def read_user_ids_file(path):
+    """Read user IDs from a file, raising OSError if it cannot be read"""
+    with open(path, encoding='utf-8') as f:
+        return parse_user_ids(f.read())
+
+def read_user_ids(source):
+    """Read user IDs from a file if ``source`` names one, else parse it as IDs"""
+    if os.path.isfile(source):
+        return read_user_ids_file(source)
+    return parse_user_ids(source)
+
+def find_users_batch(user_ids, days_back=None):
+    """Find many user IDs in one pass over each machine's users and attendance"""
+    wanted = {store.normalize_user_id(user_id): user_id for user_id in user_ids}
+    cutoff_date = datetime.now() - timedelta(days=days_back) if days_back else None
+    
+    print(f"\n{'='*60}")
+    print(f"BATCH SEARCH FOR {len(wanted)} USER ID(S)")
+    print(f"{'='*60}")
+    
+    results = {key: {'users': [], 'attendance': {}} for key in wanted}
+    failed = []
+    
+    for machine in machines:
+        print(f"\n🔍 Scanning machine: {machine}")
+        conn = connect_machine(machine)
+        if not conn:
+            failed.append(machine)
+            continue
+        try:
+            user_hits = 0
+            users = conn.get_users()
+            for user in users:
+                key = store.normalize_user_id(user.user_id)
+                if key in wanted:
+                    results[key]['users'].append((machine, user))
+                    user_hits += 1
+            
+            punch_hits = 0
+            if days_back is not None:
+                # The user list just read also decodes the log, no second download
+                for record in iter_attendance(conn, since=cutoff_date, users=users):
+                    key = store.normalize_user_id(record.user_id)
+                    if key in wanted:
+                        punches = results[key]['attendance'].setdefault(machine, [])
+                        punches.append(record.timestamp)
+                        punch_hits += 1
+            print(f"  ✅ {user_hits} user(s), {punch_hits} attendance record(s) matched")
+        except Exception as e:
+            print(f"  ❌ Error scanning {machine}: {e}")
+            failed.append(machine)
+        finally:
+            disconnect_machine(conn)
+    
+    found = 0
+    for key, original in wanted.items():
+        result = results[key]
+        print(f"\n👤 USER ID {original}")
+        if not result['users'] and not result['attendance']:
+            print(f"  ⭕ Not found on any machine")
+            continue
+        found += 1
+        print(f"  {'Machine':<18} {'UID':>6} {'Name':<24} {'Priv':>4} {'Card':>10} {'Punches':>8}  Last punch")
+        for machine, user in result['users']:
+            punches = result['attendance'].get(machine, [])
+            last_punch = max(punches).strftime('%Y-%m-%d %H:%M:%S') if punches else '-'
+            print(f"  {machine:<18} {user.uid:>6} {user.name[:24]:<24} {user.privilege:>4} "
+                  f"{user.card:>10} {len(punches):>8}  {last_punch}")
+        enrolled = {machine for machine, _ in result['users']}
+        for machine, punches in result['attendance'].items():
+            if machine not in enrolled:
+                print(f"  {machine:<18} {'-':>6} {'(not enrolled)':<24} {'-':>4} {'-':>10} "
+                      f"{len(punches):>8}  {max(punches).strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    print(f"\n📋 BATCH SUMMARY:")
+    print(f"IDs searched: {len(wanted)}")
+    print(f"IDs found: {found}")
+    print(f"Machines scanned: {len(machines) - len(failed)}/{len(machines)}")
+    if failed:
+        print(f"Failed machines: {', '.join(failed)}")
+    
+    return {original: results[key] for key, original in wanted.items()}
+
+def cache_user_lists(machines_to_cache):
+    """Download and cache user lists of machines missing from the local store"""
+    cached = 0
+    for machine in machines_to_cache:
+        conn = connect_machine(machine)
+        if not conn:
+            print(f"  ❌ Failed to connect to {machine}")
+            continue
+        try:
+            store.save_users(machine, conn.get_users())
+            cached += 1
+        except Exception as e:
+            print(f"  ❌ Error caching users of {machine}: {e}")
+        finally:
+            disconnect_machine(conn)
+    return cached
+
+def search_users_by_name(name_pattern, partial_match=True, limit=50):
+    """Search users by name across all machines using the cached name index"""
+    print(f"\n{'='*60}")
+    print(f"SEARCHING USERS BY NAME: '{name_pattern}'")
+    print(f"Partial match: {partial_match}")
+    print(f"{'='*60}")
+    
+    index = load_index()
+    uncached = [machine for machine in machines if machine not in index.signatures]
+    if uncached:
+        print(f"\n📥 Caching user lists of {len(uncached)} machine(s)...")
+        if cache_user_lists(uncached) and index.refresh():
+            save_index(index)
+    
+    matches = index.search(name_pattern, limit=limit, exact=not partial_match,
+                           machines=set(machines))
+    all_matches = [{'machine': machine, 'user': store.cached_user(user), 'score': score}
+                   for score, machine, user in matches]
+    
+    print(f"\n📋 SEARCH SUMMARY:")
+    print(f"Total matches found: {len(all_matches)}")
+    print(f"Users indexed: {len(index)}")
+    
+    if all_matches:
+        print(f"\nAll matches (best first):")
+        for i, match in enumerate(all_matches, 1):
+            user = match['user']
+            print(f"{i:2d}. {user.name} (ID: {user.user_id}, UID: {user.uid}) - "
+                  f"Machine: {match['machine']} - Score: {match['score']:.2f}")
+    
+    return all_matches
@@ -0,0 +1,139 @@
+"""Sharded fleet runner: split target machines across worker processes
+
+Each worker process owns one shard of the machines and opens its own device
+sessions, so downloading and parsing users, templates and attendance runs in
+parallel instead of under one GIL. Workers report per-machine completion
+events to the coordinator through a shared queue and return their results,
+which the coordinator merges back into one dict keyed by machine, together
+with each worker's phase timings.
+
+Command line settings (target machines, ``--ignore-health``, the health
+store selected by ``--store`` and the output options of ``views``) are
+copied into every worker by the pool initializer, so they also apply under
+the spawn and forkserver start methods, which do not inherit the
+coordinator's module globals. CSV/JSON lines rows meant for
+stdout are collected by the workers in shared temporary files and printed
+by the coordinator at the end, so worker rows and headers do not interleave.
+
+Tasks must be module-level functions ``task(machine, **kwargs)`` returning a
+picklable result (None means the machine failed).
+"""
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .profiling import phase_timer
+
+def split_shards(machines, shards):
+    """Split machines round-robin into at most ``shards`` non-empty shards"""
+    return [machines[i::shards] for i in range(shards) if machines[i::shards]]
+
+def _settings():
+    """Snapshot of the coordinator's command line settings for the workers"""
+    from . import config, health, views
+    return {
+        'machines': list(config.machines),
+        'skip_dead': health.SKIP_DEAD,
+        'health_store': health.STORE_DIR,
+        'views': {name: getattr(views, name) for name in views.SETTINGS},
+        'status_to_stderr': views.ROWS_STREAM is not None,
+    }
+
+def _init_worker(settings):
+    """Pool initializer: apply the coordinator's settings in a worker process"""
+    from . import config, health, views
+    config.machines[:] = settings['machines']
+    health.SKIP_DEAD = settings['skip_dead']
+    health.STORE_DIR = settings['health_store']
+    for name, value in settings['views'].items():
+        setattr(views, name, value)
+    if settings['status_to_stderr']:
+        sys.stdout = sys.stderr  # Spawned workers start with the real stdout
+    views.claim_results_files(truncate=False)
+
+def _run_shard(shard_id, task, shard_machines, events, kwargs):
+    """Run a task for every machine of one shard inside a worker process"""
+    phase_timer.reset()  # Forked workers inherit the coordinator's timings
+    results = {}
+    for machine in shard_machines:
+        start = time.perf_counter()
+        try:
+            results[machine] = task(machine, **kwargs)
+        except Exception as e:
+            print(f"❌ [shard {shard_id}] Error on {machine}: {e}")
+            results[machine] = None
+        events.put({
+            'shard': shard_id,
+            'pid': os.getpid(),
+            'machine': machine,
+            'ok': results[machine] is not None,
+            'seconds': time.perf_counter() - start,
+        })
+    return results, dict(phase_timer.seconds)
+
+def run_sharded(task, machines, workers=None, **kwargs):
+    """Run ``task`` for every machine across a process pool, return {machine: result}"""
+    machines = list(machines)
+    workers = workers or os.cpu_count() or 1
+    shards = split_shards(machines, workers)
+    print(f"🧩 Running {task.__name__} on {len(machines)} machine(s) "
+          f"across {len(shards)} worker process(es)")
+
+    from . import views
+    views.claim_results_files()
+    settings = _settings()
+    rows_dir = None
+    if views.ROWS_STREAM is not None:
+        # Rows for stdout: workers share files here, printed after the pool
+        rows_dir = tempfile.mkdtemp(prefix='zk-rows-')
+        settings['views']['RESULTS_FILE'] = os.path.join(rows_dir, '{kind}')
+
+    start = time.perf_counter()
+    merged = {}
+    with multiprocessing.Manager() as manager:
+        events = manager.Queue()
+        with ProcessPoolExecutor(max_workers=len(shards), initializer=_init_worker,
+                                 initargs=(settings,)) as pool:
+            futures = [pool.submit(_run_shard, shard_id, task, shard, events, kwargs)
+                       for shard_id, shard in enumerate(shards)]
+
+            completed = 0
+            while completed < len(machines):
+                try:
+                    event = events.get(timeout=0.5)
+                except queue.Empty:
+                    if all(future.done() for future in futures):
+                        break  # A worker died without reporting every machine
+                    continue
+                completed += 1
+                status = "✅" if event['ok'] else "❌"
+                print(f"{status} [{completed}/{len(machines)}] {event['machine']} "
+                      f"in {event['seconds']:.1f}s (shard {event['shard']}, pid {event['pid']})")
+
+            for shard_id, future in enumerate(futures):
+                try:
+                    results, phase_seconds = future.result()
+                    merged.update(results)
+                    for (machine, phase), seconds in phase_seconds.items():
+                        phase_timer.record(machine, phase, seconds)
+                except Exception as e:
+                    print(f"❌ Shard {shard_id} failed: {e}")
+
+    if rows_dir:
+        for kind in views.KINDS:
+            path = os.path.join(rows_dir, kind)
+            if os.path.exists(path):
+                with open(path, newline='', encoding='utf-8') as f:
+                    shutil.copyfileobj(f, views.ROWS_STREAM)
+        views.ROWS_STREAM.flush()
+        shutil.rmtree(rows_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for machine in machines if merged.get(machine) is not None)
+    print(f"🧩 Sharded run finished: {ok}/{len(machines)} machine(s) in {elapsed:.1f}s")
+    return {machine: merged.get(machine) for machine in machines}
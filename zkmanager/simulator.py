@@ -0,0 +1,406 @@
+"""In-process simulated ZK devices for stress and load testing
+
+A ``SimulatedDevice`` keeps an attendance log that grows when ``punch`` is
+called. ``SimulatedFleet.connect`` hands out connections implementing the
+part of the pyzk connection API the live capture pipeline uses, so
+``LiveCaptureManager(connect=fleet.connect, disconnect=fleet.disconnect)``
+captures from simulated devices without any network.
+
+``SimulatedDeviceServer`` serves the same devices over the ZK TCP protocol on
+loopback addresses, for tests that should go through ``connect_machine``,
+pyzk's packet parsing and real socket timeouts instead.
+
+``SimulatedFleet.drive`` generates punches at a configurable rate. Each record
+remembers when it was punched (``punched_at``, a ``time.perf_counter``
+value), so a listener can measure end-to-end capture latency.
+"""
+import heapq
+import random
+import selectors
+import socket
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+
+class SimulatedAttendance:
+    """Attendance record with the attributes of zk.attendance.Attendance"""
+
+    def __init__(self, uid, user_id, timestamp, status=1, punch=0, punched_at=None):
+        self.uid = uid
+        self.user_id = user_id
+        self.timestamp = timestamp
+        self.status = status
+        self.punch = punch
+        self.punched_at = punched_at
+
+class SimulatedDevice:
+    """One simulated machine with a thread-safe, append-only attendance log"""
+
+    def __init__(self, machine_ip, serial=None, latency=0.0):
+        self.machine_ip = machine_ip
+        self.serial = serial or f"SIM-{machine_ip}"
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.attendance = []
+        self.polls = 0
+
+    def punch(self, user_id=None, punch=0):
+        """Append one record; user_id defaults to the record's sequence number"""
+        with self.lock:
+            sequence = len(self.attendance) + 1
+            record = SimulatedAttendance(sequence, str(user_id or sequence),
+                                         BASE_TIME + timedelta(seconds=sequence), punch=punch,
+                                         punched_at=time.perf_counter())
+            self.attendance.append(record)
+        return record
+
+class SimulatedConnection:
+    """Connection to a SimulatedDevice"""
+
+    def __init__(self, device):
+        self.device = device
+        self.machine_ip = device.machine_ip
+        self.records = 0
+        self.rec_cap = 100000
+
+    def get_serialnumber(self):
+        return self.device.serial
+
+    def get_attendance(self):
+        if self.device.latency:
+            time.sleep(self.device.latency)
+        with self.device.lock:
+            self.device.polls += 1
+            return list(self.device.attendance)
+
+    def get_users(self):
+        return []
+
+    def read_sizes(self):
+        with self.device.lock:
+            self.records = len(self.device.attendance)
+        return True
+
+    def disconnect(self):
+        pass
+
+class SimulatedFleet:
+    """A set of simulated machines addressed by fake IPs
+
+    ``network`` is the first two octets of the addresses; use a loopback
+    network such as '127.99' when a SimulatedDeviceServer serves the fleet.
+    """
+
+    def __init__(self, size, latency=0.0, network='10.99'):
+        self.devices = {}
+        for i in range(size):
+            ip = f"{network}.{i // 250}.{i % 250 + 1}"
+            self.devices[ip] = SimulatedDevice(ip, latency=latency)
+
+    @property
+    def machines(self):
+        return list(self.devices)
+
+    def connect(self, machine_ip, timeout=None):
+        device = self.devices.get(machine_ip)
+        return SimulatedConnection(device) if device else None
+
+    @staticmethod
+    def disconnect(conn):
+        conn.disconnect()
+
+    def drive(self, rate, duration, stop_event=None, seed=None):
+        """Punch ``rate`` times per second per device for ``duration`` seconds
+
+        Punches arrive as one Poisson process over the whole fleet, each on a
+        random device, from the calling thread. When punching falls behind
+        schedule it catches up without sleeping. Returns the number of punches.
+        """
+        stop_event = stop_event or threading.Event()
+        rng = random.Random(seed)
+        devices = list(self.devices.values())
+        total_rate = rate * len(devices)
+        if total_rate <= 0:
+            stop_event.wait(duration)
+            return 0
+        start = time.perf_counter()
+        due = start
+        count = 0
+        while not stop_event.is_set():
+            due += rng.expovariate(total_rate)
+            if due - start > duration:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0 and stop_event.wait(delay):
+                break
+            rng.choice(devices).punch()
+            count += 1
+        return count
+
+# ==================== ZK PROTOCOL SERVER ====================
+
+# Command and reply codes of the ZK TCP protocol (as in zk.const)
+CMD_USERTEMP_RRQ = 9
+CMD_OPTIONS_RRQ = 11
+CMD_ATTLOG_RRQ = 13
+CMD_GET_FREE_SIZES = 50
+CMD_CONNECT = 1000
+CMD_EXIT = 1001
+CMD_PREPARE_DATA = 1500
+CMD_DATA = 1501
+CMD_FREE_DATA = 1502
+CMD_PREPARE_BUFFER = 1503
+CMD_READ_BUFFER = 1504
+CMD_ACK_OK = 2000
+CMD_ACK_ERROR = 2001
+FCT_USER = 5
+MACHINE_PREPARE_DATA = (0x5050, 0x7D82)
+# Commands that need no answer beyond an acknowledgement
+ACKNOWLEDGED = {1002, 1003, 1013}  # enable, disable, refresh data
+
+def _checksum(data):
+    """ZK packet checksum (pyzk's __create_checksum)"""
+    if len(data) % 2:
+        data += b'\x00'
+    checksum = 0
+    for (word,) in struct.iter_unpack('<H', data):
+        checksum += word
+        if checksum > 0xFFFF:
+            checksum -= 0xFFFF
+    checksum = ~checksum
+    while checksum < 0:
+        checksum += 0xFFFF
+    return checksum
+
+def _packet(command, session_id, reply_id, payload=b''):
+    """One TCP frame: the 8-byte top header, the command header and the payload"""
+    header = struct.pack('<4H', command, 0, session_id, reply_id)
+    header = struct.pack('<4H', command, _checksum(header + payload), session_id, reply_id)
+    return struct.pack('<HHI', *MACHINE_PREPARE_DATA, len(header) + len(payload)) + header + payload
+
+def _encode_time(t):
+    """Device time encoding (pyzk's __encode_time)"""
+    return ((((t.year % 100) * 12 * 31 + (t.month - 1) * 31 + t.day - 1) * 86400)
+            + (t.hour * 60 + t.minute) * 60 + t.second)
+
+class _Session:
+    """One client connection to a served device"""
+
+    def __init__(self, sock, device, session_id):
+        self.sock = sock
+        self.device = device
+        self.session_id = session_id
+        self.incoming = bytearray()
+        self.outgoing = bytearray()
+        self.buffer = b''
+        self.closing = False
+
+class SimulatedDeviceServer:
+    """Serve SimulatedDevices over the ZK TCP protocol, so pyzk can talk to them
+
+    Every device listens on its own ``machine_ip`` and ``port``, normally a
+    loopback address such as 127.99.0.1 (Linux routes all of 127.0.0.0/8 to
+    the loopback interface), so ``connect_machine(ip)`` reaches it unchanged.
+    The server answers what live capture uses: connect, disconnect, the
+    serial number, read sizes, and the buffered user and attendance reads,
+    which are transferred in CMD_READ_BUFFER chunks like a real device. Other
+    buffered tables are served empty. A device's ``latency`` delays its
+    attendance transfer.
+
+    All sockets are handled by one selector thread, so the server adds a
+    single thread to the process however many devices it serves.
+    ``device.polls`` counts finished sessions (CMD_EXIT).
+    """
+
+    def __init__(self, devices, port=4370, users=10):
+        self.devices = list(devices)
+        self.port = port
+        self.users = users
+        self.selector = selectors.DefaultSelector()
+        self.timers = []
+        self.timer_sequence = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.session_ids = 0
+
+    def start(self):
+        """Bind every device and start serving; raises OSError if an address is unavailable"""
+        try:
+            for device in self.devices:
+                listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                listener.bind((device.machine_ip, self.port))
+                listener.listen(64)
+                listener.setblocking(False)
+                self.selector.register(listener, selectors.EVENT_READ, device)
+        except OSError:
+            self._close_all()
+            raise
+        self.thread = threading.Thread(target=self._serve, name='zk-device-server', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self._close_all()
+
+    def _close_all(self):
+        for key in list(self.selector.get_map().values()):
+            self.selector.unregister(key.fileobj)
+            key.fileobj.close()
+        self.selector.close()
+
+    def _serve(self):
+        while not self.stop_event.is_set():
+            now = time.perf_counter()
+            timeout = min(0.2, max(0.0, self.timers[0][0] - now)) if self.timers else 0.2
+            for key, mask in self.selector.select(timeout):
+                if isinstance(key.data, _Session):
+                    self._service(key.data, mask)
+                else:
+                    self._accept(key.fileobj, key.data)
+            now = time.perf_counter()
+            while self.timers and self.timers[0][0] <= now:
+                _, _, session, data = heapq.heappop(self.timers)
+                self._send(session, data)
+
+    def _accept(self, listener, device):
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            self.session_ids = self.session_ids % 0xFFFF + 1
+            self.selector.register(sock, selectors.EVENT_READ, _Session(sock, device, self.session_ids))
+
+    def _close(self, session):
+        self.selector.unregister(session.sock)
+        session.sock.close()
+
+    def _service(self, session, mask):
+        if mask & selectors.EVENT_WRITE:
+            self._flush(session)
+        if not mask & selectors.EVENT_READ:
+            return
+        try:
+            data = session.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._close(session)
+            return
+        session.incoming += data
+        while len(session.incoming) >= 8:
+            magic1, magic2, length = struct.unpack('<HHI', session.incoming[:8])
+            if (magic1, magic2) != MACHINE_PREPARE_DATA:
+                self._close(session)
+                return
+            if len(session.incoming) < 8 + length:
+                break
+            packet = bytes(session.incoming[8:8 + length])
+            del session.incoming[:8 + length]
+            try:
+                self._handle(session, packet)
+            except struct.error:
+                self._close(session)
+                return
+
+    def _send(self, session, data):
+        if session.sock.fileno() < 0:
+            return
+        session.outgoing += data
+        self._flush(session)
+
+    def _flush(self, session):
+        try:
+            sent = session.sock.send(session.outgoing)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self._close(session)
+            return
+        del session.outgoing[:sent]
+        if session.outgoing:
+            self.selector.modify(session.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, session)
+        elif session.closing:
+            self._close(session)
+        else:
+            self.selector.modify(session.sock, selectors.EVENT_READ, session)
+
+    def _handle(self, session, packet):
+        command, _, _, reply_id = struct.unpack('<4H', packet[:8])
+        data = packet[8:]
+
+        def reply(code=CMD_ACK_OK, payload=b''):
+            return _packet(code, session.session_id, reply_id, payload)
+
+        if command == CMD_CONNECT:
+            self._send(session, reply())
+        elif command == CMD_EXIT:
+            with session.device.lock:
+                session.device.polls += 1
+            session.closing = True
+            self._send(session, reply())
+        elif command == CMD_OPTIONS_RRQ:
+            name = data.split(b'\x00')[0]
+            value = session.device.serial.encode() if name == b'~SerialNumber' else b''
+            self._send(session, reply(payload=name + b'=' + value + b'\x00'))
+        elif command == CMD_GET_FREE_SIZES:
+            with session.device.lock:
+                records = len(session.device.attendance)
+            fields = [0] * 20
+            fields[4], fields[8] = self.users, records
+            fields[14:20] = [3000, 3000, 100000, 3000, 3000 - self.users, 100000 - records]
+            self._send(session, reply(payload=struct.pack('20i', *fields) + struct.pack('3i', 0, 0, 0)))
+        elif command == CMD_PREPARE_BUFFER:
+            _, table, fct, _ = struct.unpack('<bhii', data[:11])
+            if table == CMD_USERTEMP_RRQ and fct == FCT_USER:
+                session.buffer = self._user_table()
+            elif table == CMD_ATTLOG_RRQ:
+                session.buffer = self._attendance_table(session.device)
+            else:
+                session.buffer = struct.pack('I', 0)
+            response = reply(payload=struct.pack('<BI', 0, len(session.buffer)))
+            if table == CMD_ATTLOG_RRQ and session.device.latency:
+                self.timer_sequence += 1
+                heapq.heappush(self.timers, (time.perf_counter() + session.device.latency,
+                                             self.timer_sequence, session, response))
+            else:
+                self._send(session, response)
+        elif command == CMD_READ_BUFFER:
+            start, size = struct.unpack('<ii', data[:8])
+            chunk = session.buffer[start:start + size]
+            self._send(session, reply(CMD_PREPARE_DATA, struct.pack('<II', len(chunk), 0))
+                       + reply(CMD_DATA, chunk) + reply())
+        elif command == CMD_FREE_DATA:
+            session.buffer = b''
+            self._send(session, reply())
+        elif command in ACKNOWLEDGED:
+            self._send(session, reply())
+        else:
+            self._send(session, reply(CMD_ACK_ERROR))
+
+    def _user_table(self):
+        """The 72-byte user records of users 1..self.users"""
+        rows = b''.join(struct.pack('<HB8s24sIx7sx24s', uid, 0, b'', f"User {uid}".encode(), 0,
+                                    b'1', str(uid).encode())
+                        for uid in range(1, self.users + 1))
+        return struct.pack('I', len(rows)) + rows
+
+    @staticmethod
+    def _attendance_table(device):
+        """The 40-byte attendance records of a device's whole log"""
+        with device.lock:
+            attendance = list(device.attendance)
+        rows = b''.join(struct.pack('<H24sB4sB8s', record.uid & 0xFFFF, record.user_id.encode(),
+                                    record.status, struct.pack('<I', _encode_time(record.timestamp)),
+                                    record.punch, b'')
+                        for record in attendance)
+        return struct.pack('I', len(rows)) + rows
@@ -0,0 +1,194 @@
+"""Local on-disk store of users and attendance downloaded from devices
+
+Layout, one directory per machine::
+
+    <store>/<machine>/meta.json        serial number, sync time, high-water mark
+    <store>/<machine>/users.json       user table (passwords are never stored)
+    <store>/<machine>/attendance.jsonl append-only attendance records
+"""
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+STORE_DIR = os.environ.get('ZK_STORE_DIR', 'zk_store')
+
+def store_root(store_dir=None):
+    """Return the store directory in use"""
+    return store_dir or STORE_DIR
+
+def device_dir(machine, store_dir=None, create=False):
+    """Return the directory holding a machine's data"""
+    path = os.path.join(store_root(store_dir), machine.replace(':', '_'))
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
+
+def write_json_atomic(path, data):
+    """Write JSON so that readers never see a partially written file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def read_json(path, default=None):
+    """Read a JSON file, returning default when it does not exist"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+@contextmanager
+def hold_lock(f):
+    """Hold an exclusive inter-process lock on the open file ``f``"""
+    if os.name == 'nt':
+        import msvcrt
+        position = f.tell()
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                continue  # LK_LOCK gives up after 10 seconds, keep waiting
+        f.seek(position)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if os.name == 'nt':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive inter-process lock on ``path`` (created if missing)"""
+    with open(path, 'a+b') as f, hold_lock(f):
+        yield
+
+def stored_machines(store_dir=None):
+    """List machines that have data in the store"""
+    root = store_root(store_dir)
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if os.path.isfile(os.path.join(root, name, 'meta.json')))
+
+# ==================== RECORD CONVERSION ====================
+
+def normalize_user_id(user_id):
+    """Canonical form of a user ID: '01258', 1258 and '1258' all become '1258'"""
+    return str(user_id).strip().lstrip('0') or '0'
+
+def user_to_dict(user):
+    """Convert a pyzk User to a JSON-friendly dict"""
+    return {
+        'uid': user.uid,
+        'user_id': user.user_id,
+        'name': user.name,
+        'privilege': user.privilege,
+        'has_password': bool(user.password),
+        'group_id': user.group_id,
+        'card': user.card,
+    }
+
+def cached_user(data):
+    """Wrap a cached user dict so it reads like a pyzk User"""
+    return SimpleNamespace(uid=data['uid'], user_id=data['user_id'], name=data['name'],
+                           privilege=data['privilege'], password=data['has_password'],
+                           group_id=data['group_id'], card=data['card'])
+
+def attendance_to_dict(record):
+    """Convert a pyzk Attendance to a JSON-friendly dict"""
+    return {
+        'uid': record.uid,
+        'user_id': record.user_id,
+        'timestamp': record.timestamp.isoformat(),
+        'status': record.status,
+        'punch': record.punch,
+    }
+
+def _record_key(record):
+    return f"{record['timestamp']}|{record['user_id']}|{record['punch']}"
+
+# ==================== META ====================
+
+def load_meta(machine, store_dir=None):
+    """Load a machine's metadata"""
+    return read_json(os.path.join(device_dir(machine, store_dir), 'meta.json'), {})
+
+def save_meta(machine, meta, store_dir=None):
+    """Save a machine's metadata"""
+    path = os.path.join(device_dir(machine, store_dir, create=True), 'meta.json')
+    write_json_atomic(path, meta)
+
+# ==================== USERS ====================
+
+def save_users(machine, users, store_dir=None):
+    """Replace the cached user table of a machine"""
+    path = os.path.join(device_dir(machine, store_dir, create=True), 'users.json')
+    write_json_atomic(path, [user_to_dict(user) for user in users])
+    meta = load_meta(machine, store_dir)
+    meta['users_synced_at'] = datetime.now().isoformat()
+    meta['user_count'] = len(users)
+    save_meta(machine, meta, store_dir)
+
+def load_users(machine, store_dir=None):
+    """Load the cached user table of a machine, or None if never synced"""
+    return read_json(os.path.join(device_dir(machine, store_dir), 'users.json'))
+
+# ==================== ATTENDANCE ====================
+
+def append_attendance(machine, records, store_dir=None):
+    """Append records newer than the stored high-water mark, return count added"""
+    meta = load_meta(machine, store_dir)
+    last_timestamp = meta.get('last_timestamp', '')
+    last_keys = set(meta.get('last_keys', []))
+
+    new_records = []
+    for record in records:
+        data = attendance_to_dict(record) if not isinstance(record, dict) else record
+        if data['timestamp'] < last_timestamp:
+            continue
+        if data['timestamp'] == last_timestamp and _record_key(data) in last_keys:
+            continue
+        new_records.append(data)
+
+    if new_records:
+        path = os.path.join(device_dir(machine, store_dir, create=True), 'attendance.jsonl')
+        with open(path, 'a', encoding='utf-8') as f:
+            for data in new_records:
+                f.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+        newest = max(data['timestamp'] for data in new_records)
+        if newest != last_timestamp:
+            last_keys = set()
+        last_keys.update(_record_key(data) for data in new_records
+                         if data['timestamp'] == newest)
+        meta['last_timestamp'] = newest
+        meta['last_keys'] = sorted(last_keys)
+        meta['record_count'] = meta.get('record_count', 0) + len(new_records)
+
+    meta['attendance_synced_at'] = datetime.now().isoformat()
+    save_meta(machine, meta, store_dir)
+    return len(new_records)
+
+def load_attendance(machine, store_dir=None):
+    """Yield stored attendance records of a machine with parsed timestamps"""
+    path = os.path.join(device_dir(machine, store_dir), 'attendance.jsonl')
+    if not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+                yield data
@@ -0,0 +1,255 @@
+"""Paged result views for users, attendance records and templates
+
+A ``ResultView`` wraps a downloaded result list. It sorts on demand and
+formats only the rows of the page being shown, with column widths taken from
+that page, so a 50,000-record log costs one page of string formatting rather
+than 50,000 prints. ``show`` is the single entry point used by the device and
+search helpers. Depending on the output settings below, it prints a preview
+page with a count of the remaining rows, runs an interactive pager, writes
+every row as CSV/JSON lines, or prints nothing at all. When CSV/JSON lines
+go to stdout, ``separate_rows`` moves every other print to stderr so the
+rows can be piped into another program.
+
+The settings are module globals set once from the command line
+(``--format``, ``--columns``, ``--sort``, ``--page-size``, ``--results``), like
+``health.SKIP_DEAD``.
+"""
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+from . import store
+
+# table (preview page or pager), quiet (no rows), csv or jsonl (every row)
+FORMAT = 'table'
+PAGE_SIZE = 10
+# Column names to show (unknown names are ignored per record kind), None = defaults
+COLUMNS = None
+# Column name, prefixed with '-' for descending order, None = device order
+SORT = None
+# Machine-readable rows go here instead of stdout when set
+RESULTS_FILE = None
+# The interactive menu turns the pager on when stdin is a terminal
+PAGER = False
+# Settings copied into sharded worker processes (the pager stays off there)
+SETTINGS = ('FORMAT', 'PAGE_SIZE', 'COLUMNS', 'SORT', 'RESULTS_FILE')
+# The real stdout once separate_rows has sent status lines to stderr
+ROWS_STREAM = None
+
+def _password(user):
+    return 'Set' if user.password else 'Not Set'
+
+# kind -> {column: getter}, in display order
+KINDS = {
+    'user': {
+        'uid': lambda user: user.uid,
+        'user_id': lambda user: user.user_id,
+        'name': lambda user: user.name,
+        'privilege': lambda user: user.privilege,
+        'password': _password,
+        'group_id': lambda user: user.group_id,
+        'card': lambda user: user.card,
+    },
+    'attendance': {
+        'uid': lambda record: record.uid,
+        'user_id': lambda record: record.user_id,
+        'timestamp': lambda record: record.timestamp,
+        'status': lambda record: record.status,
+        'punch': lambda record: record.punch,
+    },
+    'template': {
+        'uid': lambda template: template.uid,
+        'fid': lambda template: template.fid,
+        'valid': lambda template: template.valid,
+        'size': lambda template: template.size,
+    },
+}
+DEFAULT_COLUMNS = {
+    'user': ('user_id', 'name', 'privilege', 'password', 'group_id', 'card'),
+    'attendance': ('user_id', 'timestamp', 'status', 'punch'),
+    'template': ('uid', 'fid', 'valid'),
+}
+
+def _sort_key(value):
+    """Order numbers and numeric strings numerically, None last"""
+    if value is None:
+        return (2, '')
+    if isinstance(value, str):
+        return (0, int(value)) if value.isdigit() else (1, value)
+    return (0, value)
+
+def _text(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return '' if value is None else str(value)
+
+class ResultView:
+    """Sortable, paged view over a list of records of one kind"""
+
+    def __init__(self, records, kind, columns=None, sort=None, page_size=None, machine=None):
+        self.kind = kind
+        self.records = records
+        self.machine = machine
+        self.page_size = max(1, page_size or PAGE_SIZE)
+        self.set_columns(columns or COLUMNS)
+        self.sort = None
+        if sort or SORT:
+            self.set_sort(sort or SORT)
+
+    def set_columns(self, columns):
+        """Select columns by name, falling back to the defaults if none are known"""
+        getters = KINDS[self.kind]
+        selected = [column for column in (columns or ()) if column in getters]
+        self.columns = selected or list(DEFAULT_COLUMNS[self.kind])
+
+    def set_sort(self, sort):
+        """Sort by a column name, '-column' for descending; unknown columns are ignored"""
+        column = sort.lstrip('-')
+        getter = KINDS[self.kind].get(column)
+        if getter is None:
+            return False
+        self.records = sorted(self.records, key=lambda record: _sort_key(getter(record)),
+                              reverse=sort.startswith('-'))
+        self.sort = sort
+        return True
+
+    @property
+    def pages(self):
+        return max(1, -(-len(self.records) // self.page_size))
+
+    def rows(self, records):
+        """Yield the selected column values of records"""
+        getters = [KINDS[self.kind][column] for column in self.columns]
+        for record in records:
+            yield [getter(record) for getter in getters]
+
+    def render(self, page=0):
+        """Return one page as a compact text table"""
+        start = page * self.page_size
+        visible = [[_text(value) for value in row]
+                   for row in self.rows(self.records[start:start + self.page_size])]
+        widths = [max([len(column)] + [len(row[i]) for row in visible])
+                  for i, column in enumerate(self.columns)]
+        lines = ["  ".join(column.ljust(width) for column, width in zip(self.columns, widths)).rstrip(),
+                 "  ".join("-" * width for width in widths)]
+        lines.extend("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+                     for row in visible)
+        if self.pages > 1:
+            lines.append(f"[page {page + 1}/{self.pages}, rows {start + 1}-{start + len(visible)} "
+                         f"of {len(self.records)}]")
+        return "\n".join(lines)
+
+    def browse(self):
+        """Interactive pager: next/previous/go to page, sort, columns, quit"""
+        page = 0
+        while True:
+            print(self.render(page))
+            if self.pages == 1:
+                return
+            command = input("[Enter/n]ext [p]rev [g N]o to page [s COL|-COL]ort "
+                            "[c COL,COL]olumns [q]uit: ").strip()
+            name, _, value = command.partition(' ')
+            if name in ('', 'n'):
+                if page + 1 >= self.pages:
+                    return
+                page += 1
+            elif name == 'p':
+                page = max(0, page - 1)
+            elif name == 'g' and value.isdigit():
+                page = min(max(0, int(value) - 1), self.pages - 1)
+            elif name == 's' and value:
+                if not self.set_sort(value.strip()):
+                    print(f"Unknown column '{value}', choose from: {', '.join(KINDS[self.kind])}")
+                page = 0
+            elif name == 'c' and value:
+                self.set_columns([column.strip() for column in value.split(',')])
+            elif name == 'q':
+                return
+
+    def write(self, stream, fmt, header=True):
+        """Write every row as CSV or JSON lines, with a machine column if known"""
+        columns = (['machine'] if self.machine else []) + self.columns
+        prefix = [self.machine] if self.machine else []
+        if fmt == 'csv':
+            writer = csv.writer(stream)
+            if header:
+                writer.writerow(columns)
+            writer.writerows(prefix + row for row in self.rows(self.records))
+        else:
+            stream.writelines(json.dumps(dict(zip(columns, prefix + row)), ensure_ascii=False,
+                                         default=_text) + "\n"
+                              for row in self.rows(self.records))
+
+# (path, column set) pairs whose CSV header was already written in this run
+_headers_written = set()
+# Results files written in this run; the first write truncates them
+_opened = set()
+
+def separate_rows():
+    """Keep stdout for CSV/JSON lines rows and send every other print to stderr
+
+    Only applies to machine-readable formats without a results file, where
+    "✓ Connected" and progress lines would otherwise end up between the rows.
+    """
+    global ROWS_STREAM
+    if FORMAT in ('csv', 'jsonl') and RESULTS_FILE is None and ROWS_STREAM is None:
+        ROWS_STREAM, sys.stdout = sys.stdout, sys.stderr
+
+def _results_stream(kind):
+    """Return (stream, path); RESULTS_FILE may contain {kind} for one file per record kind"""
+    if RESULTS_FILE is None:
+        return ROWS_STREAM or sys.stdout, None
+    path = RESULTS_FILE.format(kind=kind)
+    mode = 'a' if path in _opened else 'w'
+    _opened.add(path)
+    return open(path, mode, newline='', encoding='utf-8'), path
+
+def claim_results_files(truncate=True):
+    """Mark the results files of every kind as written in this run
+
+    The coordinator of a sharded run truncates them up front, and its worker
+    processes call this with ``truncate=False`` so they append to the shared
+    files instead of truncating each other's rows.
+    """
+    if RESULTS_FILE is None or FORMAT not in ('csv', 'jsonl'):
+        return
+    for path in {RESULTS_FILE.format(kind=kind) for kind in KINDS} - _opened:
+        if truncate:
+            open(path, 'w').close()
+        _opened.add(path)
+
+def show(records, kind, machine=None):
+    """Output records according to the current settings
+
+    In table mode only the first page is formatted and printed, followed by
+    the number of remaining rows (unless the pager is on).
+    """
+    if FORMAT == 'quiet' or not records:
+        return
+    view = ResultView(records, kind, machine=machine)
+    if FORMAT in ('csv', 'jsonl'):
+        stream, path = _results_stream(kind)
+        key = (path, bool(machine), tuple(view.columns))
+        buffer = io.StringIO(newline='')
+        if path is None:
+            view.write(buffer, FORMAT, header=key not in _headers_written)
+            stream.write(buffer.getvalue())
+            stream.flush()
+        else:
+            # Sharded workers append to the same file: check for a header and
+            # write under the lock, in one write, flushed before unlocking
+            with stream, store.hold_lock(stream):
+                stream.seek(0, os.SEEK_END)
+                view.write(buffer, FORMAT, header=key not in _headers_written and stream.tell() == 0)
+                stream.write(buffer.getvalue())
+                stream.flush()
+        _headers_written.add(key)
+    elif PAGER and sys.stdin.isatty():
+        view.browse()
+    else:
+        print(view.render(0))
+        if view.pages > 1:
+            print(f"... {len(records) - view.page_size} more (use --page-size, or --format csv for all rows)")
@@ -0,0 +1,187 @@
+"""Watchlist monitoring of many badge IDs on the shared live capture pipeline
+
+A watchlist file is CSV with one user ID per line and optional label and
+alert rule columns::
+
+    user_id,label,rule
+    1258,Contractor A,any
+    1301,Night guard,outside=07:00-19:00
+    0042,Server room only,machine=192.168.1.100;192.168.1.101
+
+Rules: ``any`` (default) alerts on every punch, ``outside=HH:MM-HH:MM`` only
+on punches outside the window (which may wrap past midnight, e.g. a night
+shift ``outside=19:00-07:00``), ``machine=ip;ip`` only on punches at those
+machines. IDs are normalized ('0042' == 42) and held in a dict, so each
+event is matched in O(1) however long the list is. The file is reloaded
+when it changes on disk while the monitor runs.
+"""
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from .store import normalize_user_id
+
+def _parse_clock(value):
+    hours, minutes = value.strip().split(':')
+    return int(hours) * 60 + int(minutes)
+
+def parse_rule(rule):
+    """Parse a rule string into (kind, argument)"""
+    rule = (rule or 'any').strip()
+    if rule in ('', 'any'):
+        return ('any', None)
+    kind, _, value = rule.partition('=')
+    kind = kind.strip().lower()
+    if kind == 'outside':
+        start, end = (_parse_clock(clock) for clock in value.split('-'))
+        if start == end:
+            raise ValueError(f"Empty window in watchlist rule: {rule}")
+        return ('outside', (start, end))
+    if kind == 'machine':
+        return ('machine', frozenset(ip.strip() for ip in value.split(';') if ip.strip()))
+    raise ValueError(f"Unknown watchlist rule: {rule}")
+
+def rule_matches(rule, event):
+    """Whether an event of a watched user should raise an alert"""
+    kind, argument = rule
+    if kind == 'outside':
+        minute = event['timestamp'].hour * 60 + event['timestamp'].minute
+        start, end = argument
+        if start < end:
+            return not (start <= minute < end)
+        return not (minute >= start or minute < end)  # Window wraps past midnight
+    if kind == 'machine':
+        return event['machine'] in argument
+    return True
+
+class Watchlist:
+    """Normalized user ID -> (label, rule) mapping with hot reload"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.mtime = None
+        if path:
+            self.reload()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, user_id, label='', rule='any'):
+        """Watch one user ID"""
+        self.entries[normalize_user_id(user_id)] = {
+            'user_id': str(user_id), 'label': label, 'rule': parse_rule(rule)}
+
+    def reload(self):
+        """Load the watchlist file, replacing the entries in one assignment"""
+        entries = {}
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if not row or not row[0].strip() or row[0].strip().startswith('#'):
+                    continue
+                if row[0].strip().lower() == 'user_id':
+                    continue  # Header
+                user_id = row[0].strip()
+                label = row[1].strip() if len(row) > 1 else ''
+                rule = row[2] if len(row) > 2 else 'any'
+                entries[normalize_user_id(user_id)] = {
+                    'user_id': user_id, 'label': label, 'rule': parse_rule(rule)}
+        self.mtime = os.path.getmtime(self.path)
+        self.entries = entries
+
+    def maybe_reload(self):
+        """Reload if the file changed on disk, return True when reloaded"""
+        if not self.path:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            print(f"⚠️ Watchlist file unavailable, keeping previous list: {e}")
+            return False
+        if mtime == self.mtime:
+            return False
+        try:
+            self.reload()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Watchlist reload failed, keeping previous list: {e}")
+            self.mtime = mtime  # Do not retry until the file changes again
+            return False
+        return True
+
+    def match(self, event):
+        """Return the watchlist entry to alert on for an event, or None"""
+        entry = self.entries.get(normalize_user_id(event['user_id']))
+        if entry is not None and rule_matches(entry['rule'], event):
+            return entry
+        return None
+
+class WatchlistAlerter:
+    """Live capture listener printing (and optionally logging) watchlist alerts"""
+
+    def __init__(self, watchlist, alerts_log=None):
+        self.watchlist = watchlist
+        self.alerts_log = alerts_log
+        self.alert_count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, event_data):
+        entry = self.watchlist.match(event_data)
+        if entry is None:
+            return
+        with self.lock:
+            self.alert_count += 1
+            label = f" ({entry['label']})" if entry['label'] else ""
+            print(f"🎯 WATCHLIST ALERT{label}!")
+            print(f"   Machine: {event_data['machine']}")
+            print(f"   User ID: {event_data['user_id']}")
+            print(f"   Time: {event_data['timestamp']}")
+            print(f"   Status: {event_data['status']}")
+            print(f"   Punch: {event_data['punch']}")
+            print("-" * 30)
+            if self.alerts_log:
+                with open(self.alerts_log, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({
+                        'alerted_at': datetime.now().isoformat(),
+                        'label': entry['label'],
+                        'machine': event_data['machine'],
+                        'user_id': event_data['user_id'],
+                        'timestamp': event_data['timestamp'].isoformat(),
+                        'status': event_data['status'],
+                        'punch': event_data['punch'],
+                    }, ensure_ascii=False) + "\n")
+
+def monitor_watchlist(watchlist, duration=None, alerts_log=None, reload_interval=2):
+    """Watch all target machines for watchlist users until duration or Ctrl+C"""
+    from .config import machines
+    from .live import live_manager
+
+    alerter = WatchlistAlerter(watchlist, alerts_log)
+    print(f"👁️ Watching {len(watchlist)} user ID(s) on {len(machines)} machine(s)")
+
+    # Join the shared pipeline; only captures started here are stopped afterwards
+    live_manager.add_listener(alerter)
+    started = [machine for machine in machines if not live_manager.is_active(machine)]
+    live_manager.start_live_capture_all(duration)
+
+    try:
+        if duration:
+            print(f"⏰ Monitoring for {duration} seconds... Press Ctrl+C to stop early")
+        else:
+            print("⏰ Monitoring indefinitely... Press Ctrl+C to stop")
+        deadline = time.time() + duration if duration else None
+        while deadline is None or time.time() < deadline:
+            time.sleep(max(0, min(reload_interval, deadline - time.time())) if deadline
+                       else reload_interval)
+            if watchlist.maybe_reload():
+                print(f"🔄 Watchlist reloaded: {len(watchlist)} user ID(s)")
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping watchlist monitoring...")
+    finally:
+        live_manager.remove_listener(alerter)
+        for machine in started:
+            live_manager.stop_live_capture(machine)
+        print(f"Alerts raised: {alerter.alert_count}")
+    return alerter.alert_count